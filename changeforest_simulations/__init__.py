@@ -1,9 +1,32 @@
 import pkg_resources
 
-from ._benchmark import HEADER, benchmark
-from ._load import DATASETS, load
-from ._simulate import simulate
-from .methods import estimate_changepoints
+from ._benchmark import benchmark, benchmark_many
+from ._cache import SimulationCache
+from ._cost import CostModel
+from ._labeled_data import LabeledData
+from ._load import DATASETS, clear_cache, load, load_labeled, set_cache_limit
+from ._prefetch import prefetch_datasets
+from ._queue import TaskQueue
+from ._results import (
+    HEADER,
+    HEADERS,
+    PROFILING_COLUMNS,
+    CSVResultStore,
+    ResultStore,
+    get_result_store,
+)
+from ._runner import Task, run_tasks
+from ._scenarios import (
+    Scenario,
+    get_scenario,
+    list_scenarios,
+    register_scenario,
+    scenario_cost,
+)
+from ._shared import attach_datasets, share_datasets
+from ._simulate import simulate, simulate_iter, simulate_many
+from ._verify import verify_results
+from .methods import estimate_changepoints, r_pool
 from .score import adjusted_rand_score, hausdorff_distance, symmetric_hausdorff_distance
 
 try:
@@ -13,12 +36,39 @@ except Exception:
 
 __all__ = [
     "adjusted_rand_score",
+    "attach_datasets",
     "benchmark",
+    "benchmark_many",
+    "clear_cache",
+    "CostModel",
+    "CSVResultStore",
     "DATASETS",
     "estimate_changepoints",
+    "get_result_store",
+    "get_scenario",
     "hausdorff_distance",
     "HEADER",
+    "HEADERS",
+    "LabeledData",
+    "list_scenarios",
     "load",
+    "load_labeled",
+    "prefetch_datasets",
+    "PROFILING_COLUMNS",
+    "r_pool",
+    "register_scenario",
+    "ResultStore",
+    "run_tasks",
+    "Scenario",
+    "scenario_cost",
+    "set_cache_limit",
+    "share_datasets",
     "simulate",
+    "simulate_iter",
+    "simulate_many",
+    "SimulationCache",
     "symmetric_hausdorff_distance",
+    "Task",
+    "TaskQueue",
+    "verify_results",
 ]
@@ -1,19 +1,33 @@
 import logging
-from time import perf_counter
+import multiprocessing
+import sys
+import tracemalloc
+from time import perf_counter, process_time
 
-import pandas as pd
+import numpy as np
 
+from changeforest_simulations._limits import _receive, _send
+from changeforest_simulations._results import _is_ok, get_result_store
 from changeforest_simulations._simulate import simulate
-from changeforest_simulations.methods import estimate_changepoints
+from changeforest_simulations.methods import R_METHODS, _r_pool, estimate_changepoints
 from changeforest_simulations.score import adjusted_rand_score, hausdorff_distance
 from changeforest_simulations.utils import string_to_kwargs
 
 logger = logging.getLogger(__file__)
 
-HEADER = "dataset,seed,method,score,left_hausdorff,right_hausdorff,symmetric_hausdorff,true_changepoints,estimated_changepoints,n_cpts,time\n"
 
-
-def benchmark(method, dataset, seed, file_path=None, verify=False):
+def benchmark(
+    method,
+    dataset,
+    seed,
+    file_path=None,
+    verify=False,
+    cache=None,
+    profile=False,
+    timeout=None,
+    max_memory=None,
+    dtype=np.float64,
+):
     """Run method on dataset generated by seed.
 
     If file_path is not None, check if file at the file_path exists. If not, raise.
@@ -36,41 +50,174 @@ def benchmark(method, dataset, seed, file_path=None, verify=False):
     verify: bool, default=False
         If method, dataset, seed has already been benchmarked, compare existing results
         against new ones. Raise if they do not match.
+    cache: changeforest_simulations.SimulationCache or None, default=None
+        Cache for simulated time series. See `simulate`.
+    profile: bool, default=False
+        If True, additionally record the wall time of the simulation, the CPU time of
+        the estimation, the wall time of scoring, the peak resident set size during
+        estimation and the peak memory allocated during estimation as traced by
+        `tracemalloc` (see `PROFILING_COLUMNS`). These are only written to files with
+        header version 2. Tracing memory slows down allocations. The `time` of profiled
+        runs should thus not be compared against that of runs that were not profiled.
+    timeout: float or None, default=None
+        If not None, the method is run in a subprocess that is killed after timeout
+        seconds. The result is then recorded with status "timeout" and without an
+        estimate or scores. The status is only written to files with header version 3.
+    max_memory: int or None, default=None
+        If not None, the method is run in a subprocess that is killed once its resident
+        set size exceeds max_memory bytes (Linux only). The result is then recorded with
+        status "oom", see timeout. Within `r_pool`, methods in `R_METHODS` instead run
+        on a warm R worker, which is replaced once it exceeds timeout or max_memory. The
+        worker's resident set size includes the loaded R packages.
+    dtype: numpy.dtype, default=np.float64
+        Data type of the simulated time series, see `simulate`. Methods that do not
+        support `np.float32` get a double precision copy (see `FLOAT32_METHODS`).
+        Results are stored under the same key regardless of dtype, so use separate
+        files for different dtypes.
     """
-    if file_path is not None:
-        with open(file_path, "r") as f:
-            file_header = f.readline()
-
-        if file_header != HEADER:
-            raise ValueError(f"File {file_path} does not have the correct header.")
-
-        existing_results = pd.read_csv(file_path)
-        existing_results = existing_results[
-            lambda x: x["dataset"].eq(dataset)
-            & x["seed"].eq(seed)
-            & x["method"].eq(method)
-        ]
-        if not existing_results.empty and not verify:
+    results = benchmark_many(
+        [method],
+        dataset,
+        seed,
+        file_path=file_path,
+        verify=verify,
+        cache=cache,
+        profile=profile,
+        timeout=timeout,
+        max_memory=max_memory,
+        dtype=dtype,
+    )
+    return results[0] if results else None
+
+
+def benchmark_many(
+    methods,
+    dataset,
+    seed,
+    file_path=None,
+    verify=False,
+    write=True,
+    cache=None,
+    profile=False,
+    timeout=None,
+    max_memory=None,
+    dtype=np.float64,
+):
+    """Run each of methods on dataset generated by seed.
+
+    Same as `benchmark`, but the time series is simulated only once and shared by all
+    methods. If file_path is not None and write is True, results of all methods that
+    have not yet been benchmarked are written to the file in one batch.
+
+    methods: list of str
+        Strings describing methods to apply, for example, ['changeforest_bs', 'ecp'].
+    dataset: str
+        String describing dataset. Kwargs can be added to the string, for example,
+        'dirichlet__n_segments=5'.
+    seed: int
+        Seed passed to dataset generating process for reproducibility.
+    file_path: str or pathlib.Path or None, optional, default=None
+        Path to file where to store benchmark results.
+    verify: bool, default=False
+        If method, dataset, seed has already been benchmarked, compare existing results
+        against new ones. Raise if they do not match.
+    write: bool, default=True
+        Whether to write results to file_path. If False, file_path is only used to
+        skip or verify existing results, and writing is left to the caller.
+    cache: changeforest_simulations.SimulationCache or None, default=None
+        Cache for simulated time series. See `simulate`.
+    profile: bool, default=False
+        Whether to record profiling information. See `benchmark`. The time series is
+        only simulated once. Its `simulate_time` is recorded for each method.
+    timeout: float or None, default=None
+        Time limit in seconds for each method. See `benchmark`.
+    max_memory: int or None, default=None
+        Memory limit in bytes for each method. See `benchmark`.
+    dtype: numpy.dtype, default=np.float64
+        Data type of the simulated time series. See `benchmark`.
+
+    Returns
+    -------
+    list of dict
+        Results of methods that were not yet benchmarked, in the order of `methods`.
+    """
+    store = get_result_store(file_path) if file_path is not None else None
+
+    to_run, to_verify = [], {}
+    for method in methods:
+        existing_result = store.get(dataset, seed, method) if store else None
+        if existing_result is None:
+            to_run.append(method)
+        elif verify and _is_ok(existing_result):
+            to_verify[method] = existing_result
+        else:
             logger.info(f"Skipping {seed} {dataset} {method}.")
-            return
-        if not existing_results.empty and verify:
-            existing_results = existing_results.iloc[0].to_dict()
-            result = benchmark(method, dataset, seed, None, False)
-            if (
-                str(result["estimated_changepoints"])
-                != existing_results["estimated_changepoints"]
-            ):
-                raise ValueError(
-                    f"Inconsistent result for method={method}, dataset={dataset}, seed={seed}."
-                )
-            else:
-                return
 
+    if not to_run and not to_verify:
+        return []
+
+    tic = perf_counter()
+    change_points, time_series = simulate(dataset, seed=seed, cache=cache, dtype=dtype)
+    simulate_time = perf_counter() - tic
+
+    for method, existing_result in to_verify.items():
+        result = _benchmark(
+            method,
+            dataset,
+            seed,
+            change_points,
+            time_series,
+            timeout=timeout,
+            max_memory=max_memory,
+        )
+        if not _is_ok(result):
+            logger.info(f"Could not verify {seed} {dataset} {method}.")
+        elif (
+            str(result["estimated_changepoints"])
+            != existing_result["estimated_changepoints"]
+        ):
+            raise ValueError(
+                f"Inconsistent result for method={method}, dataset={dataset}, seed={seed}."
+            )
+
+    results = [
+        _benchmark(
+            method,
+            dataset,
+            seed,
+            change_points,
+            time_series,
+            profile=profile,
+            timeout=timeout,
+            max_memory=max_memory,
+        )
+        for method in to_run
+    ]
+    if profile:
+        for result in results:
+            result["simulate_time"] = simulate_time
+
+    if store is not None and write:
+        store.append_many(results)
+
+    return results
+
+
+def _benchmark(
+    method,
+    dataset,
+    seed,
+    change_points,
+    time_series,
+    profile=False,
+    timeout=None,
+    max_memory=None,
+):
+    """Run method on a simulated time series and score the estimate."""
     logger.info(f"Running {seed} {dataset} {method}.")
 
-    change_points, time_series = simulate(dataset, seed=seed)
     _, dataset_kwargs = string_to_kwargs(dataset)
-    _, method_kwargs = string_to_kwargs(method)
+    method_name, method_kwargs = string_to_kwargs(method)
 
     if "minimal_relative_segment_length" in method_kwargs:
         minimal_relative_segment_length = method_kwargs[
@@ -81,18 +228,47 @@ def benchmark(method, dataset, seed, file_path=None, verify=False):
     else:
         minimal_relative_segment_length = 0.01
 
-    tic = perf_counter()
-    estimate = estimate_changepoints(
-        time_series,
-        method,
-        minimal_relative_segment_length=minimal_relative_segment_length,
-    )
-    toc = perf_counter()
+    if method_name in R_METHODS and _r_pool.is_running():
+        status, estimate, stats = _estimate_on_r_pool(
+            time_series,
+            method,
+            minimal_relative_segment_length,
+            profile,
+            timeout,
+            max_memory,
+        )
+    elif timeout is None and max_memory is None:
+        status = "ok"
+        estimate, stats = _estimate(
+            time_series, method, minimal_relative_segment_length, profile
+        )
+    else:
+        status, estimate, stats = _estimate_in_subprocess(
+            time_series,
+            method,
+            minimal_relative_segment_length,
+            profile,
+            timeout,
+            max_memory,
+        )
+
+    if status != "ok":
+        logger.info(f"Exceeded limits ({status}) for {seed} {dataset} {method}.")
+        return {
+            "dataset": dataset,
+            "seed": seed,
+            "method": method,
+            "true_changepoints": list(change_points),
+            "time": stats["time"],
+            "status": status,
+        }
 
+    score_tic = perf_counter()
     score = adjusted_rand_score(change_points, estimate)
     left_hausdorff = hausdorff_distance(change_points, estimate)
     right_hausdorff = hausdorff_distance(estimate, change_points)
     symmetric_hausdorff = max(left_hausdorff, right_hausdorff)
+    score_time = perf_counter() - score_tic
 
     result = {
         "dataset": dataset,
@@ -105,24 +281,147 @@ def benchmark(method, dataset, seed, file_path=None, verify=False):
         "true_changepoints": list(change_points),
         "estimated_changepoints": list(estimate),
         "n_cpts": len(estimate) - 2,
-        "time": toc - tic,
+        "time": stats["time"],
     }
 
-    if file_path is not None:
-        if not file_path.exists():
-            raise ValueError(f"File {file_path} does not exist.")
-
-        existing_results = pd.read_csv(file_path)[["dataset", "seed", "method"]]
-        if not existing_results[
-            lambda x: x["dataset"].eq(dataset)
-            & x["seed"].eq(seed)
-            & x["method"].eq(method)
-        ].empty:
-            raise ValueError(f"Duplicate result {dataset} {seed} {method}.")
-
-        with open(file_path, "a") as f:
-            f.write(
-                f"""{dataset},{seed},{method},{score},{left_hausdorff},{right_hausdorff},{symmetric_hausdorff},"{str(list(change_points))}","{str(list(estimate))}",{len(estimate) - 2},{toc-tic}\n"""
-            )
+    if profile:
+        result["estimate_cpu_time"] = stats["estimate_cpu_time"]
+        result["score_time"] = score_time
+        result["peak_rss"] = stats["peak_rss"]
+        result["tracemalloc_peak"] = stats["tracemalloc_peak"]
 
     return result
+
+
+def _estimate(time_series, method, minimal_relative_segment_length, profile):
+    """Estimate change points. Return the estimate and a dict with timings."""
+    if profile:
+        start_tracing = not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        traced_memory = tracemalloc.get_traced_memory()[0]
+        _reset_peak_rss()
+        cpu_tic = process_time()
+
+    tic = perf_counter()
+    estimate = estimate_changepoints(
+        time_series,
+        method,
+        minimal_relative_segment_length=minimal_relative_segment_length,
+    )
+    stats = {"time": perf_counter() - tic}
+
+    if profile:
+        stats["estimate_cpu_time"] = process_time() - cpu_tic
+        stats["peak_rss"] = _peak_rss()
+        stats["tracemalloc_peak"] = tracemalloc.get_traced_memory()[1] - traced_memory
+        if start_tracing:
+            tracemalloc.stop()
+
+    return estimate, stats
+
+
+def _estimate_in_subprocess(
+    time_series, method, minimal_relative_segment_length, profile, timeout, max_memory
+):
+    """Estimate change points in a subprocess that is killed when exceeding limits.
+
+    The subprocess is killed if it runs for longer than timeout seconds or if its
+    resident set size exceeds max_memory bytes (see `_receive`). Returns a status,
+    which is one of "ok", "timeout" and "oom", the estimate (None unless the status is
+    "ok") and a dict with timings.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        # Forking avoids copying the time series and reloading R in the subprocess.
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context("spawn")
+
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_estimate_and_send,
+        args=(sender, time_series, method, minimal_relative_segment_length, profile),
+    )
+
+    tic = perf_counter()
+    process.start()
+    sender.close()
+
+    try:
+        status, result = _receive(
+            receiver, process, f"Estimation of {method}", timeout, max_memory
+        )
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+
+    return _unpack(method, status, result, perf_counter() - tic)
+
+
+def _estimate_on_r_pool(
+    time_series, method, minimal_relative_segment_length, profile, timeout, max_memory
+):
+    """Estimate change points on the R pool, which enforces limits.
+
+    Profiling information is recorded by the R worker. Returns the same as
+    `_estimate_in_subprocess`.
+    """
+    tic = perf_counter()
+    status, result = _r_pool.run(
+        _estimate,
+        time_series,
+        method,
+        minimal_relative_segment_length,
+        profile,
+        timeout=timeout,
+        max_memory=max_memory,
+    )
+    return _unpack(method, status, result, perf_counter() - tic)
+
+
+def _unpack(method, status, result, time):
+    if status == "error":
+        raise RuntimeError(f"Estimation of {method} failed:\n{result}")
+    if status != "ok":
+        return status, None, {"time": time}
+    estimate, stats = result
+    return status, estimate, stats
+
+
+def _estimate_and_send(connection, *args):
+    try:
+        _send(connection, _estimate, *args)
+    finally:
+        connection.close()
+
+
+def _reset_peak_rss():
+    """Reset the peak resident set size of this process, if supported (Linux)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss():
+    """Return the peak resident set size in bytes of this process.
+
+    On Linux, this is the peak since the last call to `_reset_peak_rss`. Elsewhere, it
+    is the peak since the start of the process.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    import resource
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
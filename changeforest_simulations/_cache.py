@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+# Modules that determine simulated time series. A hash of their code is part of keys.
+_SIMULATION_MODULES = [
+    "_simulate.py",
+    "_scenarios.py",
+    "_labeled_data.py",
+    "_load.py",
+    "utils.py",
+]
+
+# Checksums of dataset source files by path, size and modification time.
+_checksums = {}
+
+
+class SimulationCache:
+    """On-disk cache of simulated time series.
+
+    Entries are stored as pairs of `.npy` files, one for the change points and one for
+    the time series, named by a hash of the scenario, the seed, the version of `numpy`,
+    the code of the modules simulating time series (see `_SIMULATION_MODULES`) and the
+    checksums of the csv files of datasets the scenario samples from. Changes to the
+    simulation code or to datasets thus result in new entries. Time series are loaded
+    with `mmap_mode='r'` and are thus read-only. If the total size of the cache exceeds
+    `max_bytes`, least recently used entries are removed.
+
+    Code of scenarios registered outside of `changeforest_simulations` is not part of
+    the key. Clear the cache after changing it.
+
+    Parameters
+    ----------
+    directory : str or pathlib.Path
+        Directory to store the cache in. Created if it does not exist.
+    max_bytes : int, optional, default=10 * 2 ** 30
+        Maximal total size of the cache in bytes.
+    """
+
+    def __init__(self, directory, max_bytes=10 * 2**30):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, scenario, seed, dtype=np.float64):
+        """Return the cache key for scenario, seed and dtype of the time series."""
+        from changeforest_simulations._load import _SOURCE_PATHS
+        from changeforest_simulations._scenarios import get_scenario
+
+        spec, _ = get_scenario(scenario)
+        checksums = [
+            _checksum(path)
+            for dataset in spec.datasets
+            for path in _SOURCE_PATHS.get(dataset, [])
+        ]
+
+        content = [scenario, int(seed), np.__version__, _code_hash(), checksums]
+        if np.dtype(dtype) != np.float64:
+            content.append(np.dtype(dtype).name)
+        return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+    def get(self, scenario, seed, dtype=np.float64):
+        """Return cached change points and time series or None if not cached."""
+        changepoints_path, X_path = self._paths(self.key(scenario, seed, dtype))
+
+        try:
+            X = np.load(X_path, mmap_mode="r")
+            changepoints = np.load(changepoints_path, allow_pickle=True)
+        except FileNotFoundError:
+            return None
+
+        # Mark the entry as recently used. Access times are often not updated.
+        _touch(X_path)
+
+        if changepoints.dtype == object:  # Change points were passed as a list.
+            changepoints = changepoints.tolist()
+
+        return changepoints, X
+
+    def put(self, scenario, seed, changepoints, X, dtype=np.float64):
+        """Store change points and time series, then evict old entries if required."""
+        changepoints_path, X_path = self._paths(self.key(scenario, seed, dtype))
+
+        if not isinstance(changepoints, np.ndarray):
+            changepoints = np.array(changepoints, dtype=object)
+
+        # The time series is written last such that it marks a complete entry.
+        _atomic_save(changepoints_path, changepoints)
+        _atomic_save(X_path, np.asarray(X))
+        _touch(X_path)
+
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits into max_bytes."""
+        entries = []
+        for X_path in self.directory.glob("*_X.npy"):
+            changepoints_path = X_path.with_name(
+                X_path.name.replace("_X.npy", "_changepoints.npy")
+            )
+            try:
+                stat = X_path.stat()
+                size = stat.st_size + changepoints_path.stat().st_size
+            except FileNotFoundError:  # Removed or written by another process.
+                continue
+            entries.append((stat.st_mtime_ns, size, X_path, changepoints_path))
+
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, X_path, changepoints_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for path in (X_path, changepoints_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def clear(self):
+        """Remove all entries."""
+        for path in self.directory.glob("*.npy"):
+            path.unlink()
+
+    def _paths(self, key):
+        return (
+            self.directory / f"{key}_changepoints.npy",
+            self.directory / f"{key}_X.npy",
+        )
+
+
+@lru_cache(maxsize=None)
+def _code_hash():
+    sha256 = hashlib.sha256()
+    for name in _SIMULATION_MODULES:
+        sha256.update((Path(__file__).parent / name).read_bytes())
+    return sha256.hexdigest()
+
+
+def _checksum(path):
+    """Return the sha256 of path, or None if it does not exist (yet)."""
+    from changeforest_simulations._load import _sha256
+
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _checksums:
+        _checksums[key] = _sha256(path)
+    return _checksums[key]
+
+
+def _touch(path):
+    # Timestamps set by the file system have a resolution of a few milliseconds, such
+    # that entries used one after the other would be ordered arbitrarily on eviction.
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+def _atomic_save(path, array):
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array, allow_pickle=array.dtype == object)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
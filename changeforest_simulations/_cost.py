@@ -0,0 +1,101 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from changeforest_simulations.utils import string_to_kwargs
+
+logger = logging.getLogger(__file__)
+
+
+class CostModel:
+    """Predict the time to benchmark a method on a dataset from past results.
+
+    For each method and scenario (dataset without `n_observations`), the median
+    `time` per number of observations is stored. If the method has been run on the
+    scenario with the same number of observations, that median is predicted. Else,
+    a power law `time = a * n_observations ** b` is fitted to the medians of the
+    scenario (with `b = 1` if only one number of observations is known). Else, the
+    median time of the method over all datasets is predicted, and `default` if the
+    method has never been run.
+
+    Parameters
+    ----------
+    results : iterable of dict, optional, default=()
+        Past results with keys `method`, `dataset` and `time`.
+    default : float, optional, default=1.0
+        Prediction for methods without past results.
+    """
+
+    def __init__(self, results=(), default=1.0):
+        self.default = default
+
+        times = {}
+        for result in results:
+            time = result.get("time")
+            if time is None or not np.isfinite(time):
+                continue
+            key, n_observations = _scaling_key(result["method"], result["dataset"])
+            times.setdefault(key, {}).setdefault(n_observations, []).append(time)
+
+        self._medians = {
+            key: {n: np.median(values) for n, values in by_n.items()}
+            for key, by_n in times.items()
+        }
+
+        by_method = {}
+        for key, by_n in times.items():
+            by_method.setdefault(key[0], []).extend(
+                time for values in by_n.values() for time in values
+            )
+        self._method_medians = {
+            method: np.median(values) for method, values in by_method.items()
+        }
+
+    @classmethod
+    def from_files(cls, file_paths, default=1.0):
+        """Fit a cost model to the results in csv files written by `benchmark`."""
+        dfs = []
+        for file_path in file_paths:
+            try:
+                dfs.append(
+                    pd.read_csv(file_path, usecols=["dataset", "method", "time"])
+                )
+            except (ValueError, pd.errors.EmptyDataError):
+                logger.warning(f"Could not read timings from {file_path}.")
+
+        if not dfs:
+            return cls(default=default)
+
+        return cls(pd.concat(dfs).to_dict("records"), default=default)
+
+    def predict(self, method, dataset):
+        """Predict the time in seconds to benchmark method on dataset."""
+        key, n_observations = _scaling_key(method, dataset)
+        medians = self._medians.get(key)
+
+        if not medians:
+            return self._method_medians.get(method, self.default)
+
+        if n_observations in medians:
+            return medians[n_observations]
+
+        known = {n: time for n, time in medians.items() if n is not None}
+        if n_observations is None or not known:
+            return np.median(list(medians.values()))
+
+        n = np.log(list(known))
+        log_times = np.log(np.maximum(list(known.values()), 1e-6))
+        if len(known) == 1:
+            slope = 1.0
+        else:
+            slope = np.polyfit(n, log_times, 1)[0]
+        intercept = np.mean(log_times - slope * n)
+        return float(np.exp(intercept + slope * np.log(n_observations)))
+
+
+def _scaling_key(method, dataset):
+    """Split into the number of observations and everything else."""
+    name, kwargs = string_to_kwargs(dataset)
+    n_observations = kwargs.pop("n_observations", None)
+    return (method, name, tuple(sorted(kwargs.items()))), n_observations
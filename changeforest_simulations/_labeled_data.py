@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+
+class LabeledData:
+    """Labeled dataset with rows grouped by class for fast sampling.
+
+    Row indices are stored grouped by class in compressed sparse row (CSR) format: the
+    rows of class `classes[k]` are `indices[indptr[k]:indptr[k + 1]]`, in increasing
+    order. Sampling from a class is then a slice plus a single gather from the
+    contiguous feature matrix `X`.
+
+    Parameters
+    ----------
+    X : array-like of shape (n, p)
+        Features. Stored as a C-contiguous float64 array.
+    y : array-like of shape (n,)
+        Class labels.
+    columns : list of str, optional, default=None
+        Names of features.
+    """
+
+    def __init__(self, X, y, columns=None):
+        self.X = np.ascontiguousarray(X, dtype=np.float64)
+        self.y = np.asarray(y)
+        self.columns = columns
+
+        if self.X.ndim != 2 or self.X.shape[0] != len(self.y):
+            raise ValueError("X must be of shape (n, p) and y of shape (n,).")
+
+        self.classes, self.codes = np.unique(self.y, return_inverse=True)
+        self.indices = np.argsort(self.codes, kind="stable")
+        self.indptr = np.append(0, np.bincount(self.codes).cumsum())
+
+        # Same order as `pd.value_counts(y)`, which determines random draws.
+        self.value_counts = pd.value_counts(self.y)
+
+    @classmethod
+    def from_frame(cls, data, class_label="class"):
+        """Create from a DataFrame with a column class_label holding labels."""
+        features = data.drop(columns=class_label)
+        return cls(
+            features.to_numpy(),
+            data[class_label].to_numpy(),
+            columns=list(features.columns),
+        )
+
+    def __len__(self):
+        return len(self.y)
+
+    def rows(self, label):
+        """Return the indices of rows with class label, in increasing order."""
+        code = np.searchsorted(self.classes, label)
+        if code == len(self.classes) or self.classes[code] != label:
+            raise KeyError(label)
+        return self.indices[self.indptr[code] : self.indptr[code + 1]]
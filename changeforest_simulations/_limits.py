@@ -0,0 +1,58 @@
+import signal
+import traceback
+from time import perf_counter
+
+_POLL_INTERVAL = 0.1
+
+
+def _send(connection, func, *args, **kwargs):
+    """Call func and send its status and result (or traceback) over connection.
+
+    The status is "ok", "oom" if func ran out of memory or "error" if it raised.
+    """
+    try:
+        connection.send(("ok", func(*args, **kwargs)))
+    except MemoryError:
+        connection.send(("oom", None))
+    except BaseException:
+        message = traceback.format_exc()
+        # R reports failed allocations as errors. These are translated by rpy2.
+        status = "oom" if "cannot allocate vector" in message else "error"
+        connection.send((status, message))
+
+
+def _receive(connection, process, name, timeout=None, max_memory=None):
+    """Wait for process to send a status and result with `_send`, within limits.
+
+    Stop waiting if more than timeout seconds passed or if the resident set size of
+    process exceeds max_memory bytes. The latter is polled every `_POLL_INTERVAL`
+    seconds and is only supported on Linux. Returns a status, which is one of "ok",
+    "error", "timeout" and "oom", and the result, the traceback for "error" or None.
+    The caller is responsible for killing process if it exceeded limits.
+    """
+    tic = perf_counter()
+    while True:
+        if connection.poll(_POLL_INTERVAL):
+            try:
+                return connection.recv()
+            except EOFError:  # Process died without sending a result.
+                process.join()
+                if process.exitcode == -signal.SIGKILL:  # Likely the OOM killer.
+                    return "oom", None
+                raise RuntimeError(f"{name} exited with code {process.exitcode}.")
+        elif timeout is not None and perf_counter() - tic > timeout:
+            return "timeout", None
+        elif max_memory is not None and _rss(process.pid) > max_memory:
+            return "oom", None
+
+
+def _rss(pid):
+    """Return the resident set size of process pid in bytes or 0 if unknown."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
@@ -1,11 +1,21 @@
+import hashlib
+import json
+import logging
+import os
 import tempfile
+import threading
 import urllib
 import zipfile
+from collections import OrderedDict, namedtuple
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from sklearn.datasets import fetch_openml
 
+from changeforest_simulations._cache import _atomic_save
+from changeforest_simulations._labeled_data import LabeledData
+
 _DATASET_PATH = Path(__file__).parents[1].resolve() / "datasets"
 _LETTERS_PATH = _DATASET_PATH / "letters.csv"
 _IRIS_PATH = _DATASET_PATH / "iris.csv"
@@ -18,6 +28,25 @@ _COVERTYPE_PATH = _DATASET_PATH / "covertype.csv"
 _DRY_BEANS_PATH = _DATASET_PATH / "dry-beans.csv"
 _BREAST_CANCER_PATH = _DATASET_PATH / "breast-cancer.csv"
 
+# Binary copies of the csv files, see `_read_binary`.
+_BINARY_PATH = _DATASET_PATH / ".binary"
+_BINARY_VERSION = 1
+_SOURCE_PATHS = {
+    "letters": [_LETTERS_PATH],
+    "iris": [_IRIS_PATH],
+    "red_wine": [_RED_WINE_PATH],
+    "white_wine": [_WHITE_WINE_PATH],
+    "wine": [_WHITE_WINE_PATH, _RED_WINE_PATH],
+    "glass": [_GLASS_PATH],
+    "eeg_eye_state": [_EEG_EYE_STATE_PATH],
+    "abalone": [_ABALONE_PATH],
+    "covertype": [_COVERTYPE_PATH],
+    "dry-beans": [_DRY_BEANS_PATH],
+    "breast-cancer": [_BREAST_CANCER_PATH],
+}
+
+logger = logging.getLogger(__file__)
+
 MULTICLASS_DATASETS = [
     "letters",
     "iris",
@@ -40,7 +69,7 @@ def load_letters():
         return pd.read_csv(_LETTERS_PATH)
     else:
         dataset = fetch_openml(data_id=6)["frame"]
-        dataset.to_csv(_LETTERS_PATH, index=False)
+        _atomic_to_csv(dataset, _LETTERS_PATH)
         return dataset
 
 
@@ -49,7 +78,7 @@ def load_iris():
         return pd.read_csv(_IRIS_PATH)
     else:
         dataset = fetch_openml(data_id=61)["frame"]
-        dataset.to_csv(_IRIS_PATH, index=False)
+        _atomic_to_csv(dataset, _IRIS_PATH)
         return dataset
 
 
@@ -62,7 +91,7 @@ def load_red_wine():
             sep=";",
         )
         dataset = dataset.rename(columns={"quality": "class"}, copy=False)
-        dataset.to_csv(_RED_WINE_PATH, index=False)
+        _atomic_to_csv(dataset, _RED_WINE_PATH)
         return dataset
 
 
@@ -75,7 +104,7 @@ def load_white_wine():
             sep=";",
         )
         dataset = dataset.rename(columns={"quality": "class"}, copy=False)
-        dataset.to_csv(_WHITE_WINE_PATH, index=False)
+        _atomic_to_csv(dataset, _WHITE_WINE_PATH)
         return dataset
 
 
@@ -95,7 +124,7 @@ def load_glass():
             sep=",",
         )
         dataset = dataset.drop(columns=["id"])
-        dataset.to_csv(_GLASS_PATH, index=False)
+        _atomic_to_csv(dataset, _GLASS_PATH)
         return dataset
 
 
@@ -112,7 +141,7 @@ def load_eeg_eye_state():
 
         dataset = pd.read_csv(temp_eeg_file, sep=",", header=None)
         dataset.columns = [f"eeg_{idx}" for idx in range(14)] + ["class"]
-        dataset.to_csv(_EEG_EYE_STATE_PATH, index=False)
+        _atomic_to_csv(dataset, _EEG_EYE_STATE_PATH)
         return dataset
 
 
@@ -137,7 +166,7 @@ def load_abalone():
         dataset["male"] = dataset["sex"].eq("M").astype("float")
         dataset["infant"] = dataset["sex"].eq("I").astype("float")
         dataset = dataset.drop(columns="sex")
-        dataset.to_csv(_ABALONE_PATH, index=False)
+        _atomic_to_csv(dataset, _ABALONE_PATH)
         return dataset
 
 
@@ -146,7 +175,7 @@ def load_covertype():
         return pd.read_csv(_COVERTYPE_PATH).astype(float)
     else:
         dataset = fetch_openml(data_id=1596)["frame"]
-        dataset.to_csv(_COVERTYPE_PATH, index=False)
+        _atomic_to_csv(dataset, _COVERTYPE_PATH)
         return dataset.astype(float)
 
 
@@ -165,7 +194,7 @@ def load_dry_beans():
             dataset = pd.read_excel(z.open("DryBeanDataset/Dry_Bean_Dataset.xlsx"))
 
         dataset = dataset.rename(columns={"Class": "class"}, copy=False)
-        dataset.to_csv(_DRY_BEANS_PATH, index=False)
+        _atomic_to_csv(dataset, _DRY_BEANS_PATH)
         return dataset
 
 
@@ -194,11 +223,261 @@ def load_breast_cancer():
         # 1 is by far the most common value in `bare_nuclei`.
         dataset.loc[lambda x: x["bare_nuclei"].eq("?"), "bare_nuclei"] = 1
         dataset = dataset.astype("float")
-        dataset.to_csv(_BREAST_CANCER_PATH, index=False)
+        _atomic_to_csv(dataset, _BREAST_CANCER_PATH)
         return dataset
 
 
 def load(dataset):
+    """Load dataset as a DataFrame with class labels in column `class`.
+
+    Datasets are read once per process and cached (see `load_labeled`). The returned
+    DataFrame is a cheap view on the cached, read-only arrays. Features are float64.
+    Copy it before modifying it.
+    """
+    entry = _load_entry(dataset, "class")
+    data = pd.DataFrame(
+        entry.data.X, columns=entry.data.columns, index=entry.index, copy=False
+    )
+    data.insert(entry.columns.index("class"), "class", entry.data.y)
+    return data
+
+
+def load_labeled(dataset, class_label="class"):
+    """Load dataset as `LabeledData`. Cached per process, with read-only arrays."""
+    return _load_entry(dataset, class_label).data
+
+
+def clear_cache():
+    """Remove all datasets from the in-process cache of `load` and `load_labeled`."""
+    _cache.clear()
+
+
+def set_cache_limit(max_bytes):
+    """Set the maximal size of the in-process dataset cache in bytes.
+
+    If the cached datasets exceed `max_bytes`, least recently used ones are removed.
+    The most recently loaded dataset is always kept.
+    """
+    _cache.max_bytes = max_bytes
+    _cache.evict()
+
+
+_Entry = namedtuple("_Entry", ["data", "columns", "index"])
+
+
+class _DatasetCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, load):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            self._entries[key] = entry = load()
+            self.evict()
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self.evict()
+
+    def evict(self):
+        with self._lock:
+            while len(self._entries) > 1 and self.nbytes() > self.max_bytes:
+                self._entries.popitem(last=False)
+
+    def remove(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def nbytes(self):
+        with self._lock:
+            return sum(_nbytes(entry.data) for entry in self._entries.values())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _DatasetCache(max_bytes=4 * 2**30)
+
+
+def _load_entry(dataset, class_label):
+    return _cache.get((dataset, class_label), lambda: _read(dataset, class_label))
+
+
+def _read(dataset, class_label):
+    if class_label == "class" and dataset in _SOURCE_PATHS:
+        entry = _read_binary(dataset)
+        if entry is not None:
+            return entry
+
+    frame = _load_frame(dataset)
+    data = LabeledData.from_frame(frame, class_label=class_label)
+    index = None if isinstance(frame.index, pd.RangeIndex) else frame.index
+    entry = _Entry(_read_only(data), list(frame.columns), index)
+
+    if class_label == "class" and dataset in _SOURCE_PATHS:
+        try:
+            _write_binary(dataset, entry)
+        except (OSError, TypeError) as error:
+            logger.warning(f"Could not write binary copy of {dataset}: {error}")
+
+    return entry
+
+
+def _read_binary(dataset):
+    """Memory-map the binary copy of dataset, or return None if it is not valid.
+
+    The binary copy in `datasets/.binary/<dataset>` consists of `X.npy` with features,
+    `y.npy` with class labels, optionally `index.npy`, and `meta.json`, written last,
+    with column names and the size, modification time and sha256 of the source csv
+    files. If size and modification time of the sources match, the copy is used
+    directly. Else the sources are hashed and compared.
+    """
+    directory = _BINARY_PATH / dataset
+    try:
+        meta = json.loads((directory / "meta.json").read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if meta.get("version") != _BINARY_VERSION or not _sources_match(dataset, meta):
+        return None
+
+    try:
+        X = np.load(directory / "X.npy", mmap_mode="r")
+        y = np.load(directory / "y.npy")
+        index = np.load(directory / "index.npy") if meta["has_index"] else None
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if y.dtype.kind == "U":  # Labels were strings in the csv files.
+        y = y.astype(object)
+
+    data = LabeledData(X, y, columns=meta["columns"][:])
+    data.columns.remove("class")
+    index = pd.Index(index) if index is not None else None
+    return _Entry(_read_only(data), meta["columns"], index)
+
+
+def _write_binary(dataset, entry):
+    data = entry.data
+    y = data.y
+    if y.dtype == object:
+        if not all(isinstance(label, str) for label in y):
+            raise TypeError("Class labels must be numeric or strings.")
+        y = y.astype(str)
+
+    directory = _BINARY_PATH / dataset
+    directory.mkdir(parents=True, exist_ok=True)
+    # Remove metadata first, such that the copy is invalid while it is rewritten.
+    (directory / "meta.json").unlink(missing_ok=True)
+
+    _atomic_save(directory / "X.npy", data.X)
+    _atomic_save(directory / "y.npy", y)
+    if entry.index is not None:
+        _atomic_save(directory / "index.npy", entry.index.to_numpy())
+
+    meta = {
+        "version": _BINARY_VERSION,
+        "columns": entry.columns,
+        "has_index": entry.index is not None,
+        "sources": [
+            _source_stat(path, checksum=True) for path in _SOURCE_PATHS[dataset]
+        ],
+    }
+    _atomic_write_text(directory / "meta.json", json.dumps(meta))
+
+
+def _sources_match(dataset, meta):
+    sources = meta["sources"]
+    paths = _SOURCE_PATHS[dataset]
+    if len(sources) != len(paths):
+        return False
+
+    changed = False
+    for source, path in zip(sources, paths):
+        try:
+            stat = _source_stat(path)
+        except FileNotFoundError:
+            return False
+
+        if stat["size"] != source["size"]:
+            return False
+        if stat["mtime_ns"] != source["mtime_ns"]:
+            # E.g., after a fresh checkout. Fall back to comparing checksums.
+            if _sha256(path) != source["sha256"]:
+                return False
+            source["mtime_ns"] = stat["mtime_ns"]
+            changed = True
+
+    if changed:
+        try:
+            _atomic_write_text(_BINARY_PATH / dataset / "meta.json", json.dumps(meta))
+        except OSError:
+            pass
+
+    return True
+
+
+def _source_stat(path, checksum=False):
+    stat = Path(path).stat()
+    result = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if checksum:
+        result["sha256"] = _sha256(path)
+    return result
+
+
+def _sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _atomic_to_csv(data, path):
+    """Write csv through a temporary file, such that readers never see partial files."""
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            data.to_csv(f, index=False)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _atomic_write_text(path, text):
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _read_only(data):
+    for array in [data.X, data.y, data.codes, data.indices, data.indptr]:
+        array.setflags(write=False)
+    return data
+
+
+def _nbytes(data):
+    arrays = [data.X, data.y, data.codes, data.indices, data.indptr]
+    return sum(array.nbytes for array in arrays)
+
+
+def _load_frame(dataset):
     if dataset == "iris":
         return load_iris()
     elif dataset == "letters":
@@ -0,0 +1,182 @@
+import logging
+import os
+import shutil
+import tempfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from changeforest_simulations import _load
+
+logger = logging.getLogger(__file__)
+
+_CHECKSUMS_PATH = _load._DATASET_PATH / "SHA256SUMS"
+
+
+def prefetch_datasets(datasets=None, base_url=None, n_jobs=8):
+    """Download the csv files of datasets concurrently.
+
+    Files that exist and match the checksum in `datasets/SHA256SUMS` are skipped.
+    Others are downloaded, written to a temporary file and renamed, such that
+    concurrent readers never see partial files.
+
+    Parameters
+    ----------
+    datasets : list of str, optional, default=None
+        Datasets to fetch, see `load`. If None, all datasets in `DATASETS`.
+    base_url : str, optional, default=None
+        Fetch `<base_url>/<file name>`, e.g., from a local mirror directory or an
+        `http(s)://` or `file://` URL, instead of the original sources. Files are
+        verified against `datasets/SHA256SUMS` or, for files without a checksum there,
+        against `<base_url>/SHA256SUMS`, which can be written with `sha256sum`. Files
+        without a checksum in either are not accepted from a mirror. If None,
+        the environment variable `CHANGEFOREST_SIMULATIONS_MIRROR` is used if set.
+        Else, datasets are downloaded and converted from the original sources and
+        checksum mismatches only raise a warning.
+    n_jobs : int, optional, default=8
+        Number of concurrent downloads.
+
+    Returns
+    -------
+    list of pathlib.Path
+        Paths of files that were fetched.
+    """
+    if datasets is None:
+        datasets = _load.DATASETS
+    if base_url is None:
+        base_url = os.environ.get("CHANGEFOREST_SIMULATIONS_MIRROR")
+
+    for dataset in datasets:
+        if dataset not in _load._SOURCE_PATHS:
+            raise ValueError(
+                f"Invalid dataset name {dataset}. Available datasets are "
+                f"{list(_load._SOURCE_PATHS)}."
+            )
+
+    checksums = read_checksums()
+    missing = [
+        dataset
+        for dataset in dict.fromkeys(datasets)
+        if not all(_is_valid(path, checksums) for path in _load._SOURCE_PATHS[dataset])
+    ]
+
+    paths = sorted(
+        {
+            path
+            for dataset in missing
+            for path in _load._SOURCE_PATHS[dataset]
+            if not _is_valid(path, checksums)
+        }
+    )
+
+    if base_url is not None and not all(path.name in checksums for path in paths):
+        checksums = {**_read_mirror_checksums(base_url), **checksums}
+
+    with ThreadPoolExecutor(n_jobs) as executor:
+        if base_url is not None:
+            futures = [
+                executor.submit(_fetch_from_mirror, base_url, path, checksums)
+                for path in paths
+            ]
+        else:
+            # Several datasets share source files, e.g., `wine` consists of `red_wine`
+            # and `white_wine`. Fetch each file once through the smallest dataset.
+            futures = [
+                executor.submit(_fetch_from_source, dataset, checksums)
+                for dataset in dict.fromkeys(_source_dataset(path) for path in paths)
+            ]
+
+        fetched = []
+        for future in futures:
+            fetched.extend(future.result())
+
+    return fetched
+
+
+def read_checksums(path=_CHECKSUMS_PATH):
+    """Read a manifest in `sha256sum` format into a dict of file name to checksum."""
+    with open(path) as f:
+        return _parse_checksums(f.read())
+
+
+def _parse_checksums(text):
+    checksums = {}
+    for line in text.splitlines():
+        if line.strip():
+            checksum, name = line.split(maxsplit=1)
+            checksums[name.strip().lstrip("*")] = checksum
+    return checksums
+
+
+def _read_mirror_checksums(base_url):
+    source = f"{base_url.rstrip('/')}/SHA256SUMS"
+    try:
+        with _open(source) as f:
+            return _parse_checksums(f.read().decode())
+    except (OSError, ValueError):  # urllib.error.URLError is an OSError.
+        return {}
+
+
+def _open(source):
+    if "://" in source:
+        return urllib.request.urlopen(source)
+    return open(source, "rb")
+
+
+def _is_valid(path, checksums):
+    if not path.exists():
+        return False
+    if path.name not in checksums:
+        return True
+    return _load._sha256(path) == checksums[path.name]
+
+
+def _source_dataset(path):
+    """Dataset with the fewest source files that include path."""
+    return min(
+        (dataset for dataset, paths in _load._SOURCE_PATHS.items() if path in paths),
+        key=lambda dataset: len(_load._SOURCE_PATHS[dataset]),
+    )
+
+
+def _fetch_from_mirror(base_url, path, checksums):
+    if path.name not in checksums:
+        raise ValueError(
+            f"No checksum for {path.name} in {_CHECKSUMS_PATH} or "
+            f"{base_url.rstrip('/')}/SHA256SUMS."
+        )
+
+    source = f"{base_url.rstrip('/')}/{path.name}"
+    logger.info(f"Fetching {source}.")
+
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f, _open(source) as response:
+            shutil.copyfileobj(response, f)
+
+        checksum = _load._sha256(temp_path)
+        if checksum != checksums[path.name]:
+            raise ValueError(
+                f"Checksum of {source} is {checksum}. Expected {checksums[path.name]}."
+            )
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    return [path]
+
+
+def _fetch_from_source(dataset, checksums):
+    logger.info(f"Fetching {dataset} from its original source.")
+    paths = [path for path in _load._SOURCE_PATHS[dataset] if not path.exists()]
+    _load._load_frame(dataset)
+
+    for path in _load._SOURCE_PATHS[dataset]:
+        if not _is_valid(path, checksums):
+            logger.warning(
+                f"Checksum of {path} does not match {_CHECKSUMS_PATH}. The original "
+                "source might have changed."
+            )
+    return [Path(path) for path in paths]
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__file__)
+
+
+class TaskQueue:
+    """Claim tasks through lock files in a directory shared by several nodes.
+
+    A task is claimed by creating a lock file with `O_CREAT | O_EXCL`, which is atomic
+    also on NFS (v3 and later). While the queue is entered as a context manager, a
+    background thread touches all lock files held by this process every
+    `heartbeat_interval` seconds. Lock files that have not been touched for
+    `stale_after` seconds, e.g., because their node crashed, may be claimed by other
+    nodes. `stale_after` should thus be much larger than `heartbeat_interval` and
+    than the clock skew between nodes.
+
+    The queue is also used to serialize writes of several nodes to the same result file,
+    see `lock`.
+
+    Parameters
+    ----------
+    directory : str or pathlib.Path
+        Shared directory for lock files. Created if it does not exist.
+    stale_after : float, optional, default=600
+        Seconds after which a lock file that has not been touched is considered stale.
+    heartbeat_interval : float, optional, default=60
+        Seconds between touching lock files held by this process.
+    """
+
+    def __init__(self, directory, stale_after=600, heartbeat_interval=60):
+        self.directory = Path(directory)
+        self.stale_after = stale_after
+        self.heartbeat_interval = heartbeat_interval
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._held = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        for path in list(self._held):
+            self._release(path)
+
+    def claim(self, task):
+        """Try to claim a task. Return whether it was claimed by this process."""
+        return self._acquire(self._path(task))
+
+    def release(self, task):
+        """Release a task claimed with `claim`."""
+        self._release(self._path(task))
+
+    @contextmanager
+    def lock(self, file_path):
+        """Exclusive lock on file_path (e.g., a result file) across nodes."""
+        path = self._path(str(Path(file_path).resolve()), suffix=".write.lock")
+        while not self._acquire(path):
+            time.sleep(0.1)
+        try:
+            yield
+        finally:
+            self._release(path)
+
+    def heartbeat(self):
+        """Touch all lock files held by this process."""
+        with self._lock:
+            held = list(self._held)
+
+        for path in held:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                logger.warning(f"Lock file {path} was removed by another process.")
+
+    def _path(self, task, suffix=".lock"):
+        if isinstance(task, tuple):
+            method, dataset, seed, file_path = task
+            task = [method, dataset, int(seed), str(Path(file_path).resolve())]
+        key = hashlib.sha256(json.dumps(task).encode()).hexdigest()
+        return self.directory / f"{key}{suffix}"
+
+    def _acquire(self, path):
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._remove_if_stale(path):
+                    return False
+                continue
+
+            with os.fdopen(fd, "w") as f:
+                f.write(f"{socket.gethostname()} {os.getpid()}\n")
+
+            with self._lock:
+                self._held.add(path)
+            return True
+
+        return False
+
+    def _release(self, path):
+        with self._lock:
+            self._held.discard(path)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _remove_if_stale(self, path):
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:  # Released in the meantime.
+            return True
+
+        if age < self.stale_after:
+            return False
+
+        # Move the lock file out of the way. Only one process can succeed. If another
+        # process replaced the stale lock file in the meantime, put it back.
+        stale_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.stale")
+        try:
+            os.rename(path, stale_path)
+        except FileNotFoundError:
+            return True
+
+        try:
+            if time.time() - stale_path.stat().st_mtime < self.stale_after:
+                try:
+                    os.link(stale_path, path)
+                except FileExistsError:
+                    pass
+                return False
+
+            with open(stale_path) as f:
+                logger.warning(f"Reclaiming stale lock of {f.read().strip()}.")
+            return True
+        finally:
+            stale_path.unlink()
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            self.heartbeat()
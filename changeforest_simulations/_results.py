@@ -0,0 +1,256 @@
+import hashlib
+import io
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import pandas as pd
+
+HEADER = "dataset,seed,method,score,left_hausdorff,right_hausdorff,symmetric_hausdorff,true_changepoints,estimated_changepoints,n_cpts,time\n"
+
+# Columns filled by `benchmark(..., profile=True)`. `time` is the wall time of the
+# estimation, `peak_rss` and `tracemalloc_peak` are in bytes.
+PROFILING_COLUMNS = [
+    "simulate_time",
+    "estimate_cpu_time",
+    "score_time",
+    "peak_rss",
+    "tracemalloc_peak",
+]
+
+# Headers by version. Version 1 is `HEADER`. Version 2 adds `PROFILING_COLUMNS`.
+# Version 3 adds a `status` column, which is one of "ok", "timeout" and "oom".
+HEADERS = {
+    1: HEADER,
+    2: HEADER[:-1] + "," + ",".join(PROFILING_COLUMNS) + "\n",
+    3: HEADER[:-1] + "," + ",".join(PROFILING_COLUMNS) + ",status\n",
+}
+
+_CHANGEPOINT_COLUMNS = ["true_changepoints", "estimated_changepoints"]
+
+_STORES = {}
+
+
+class ResultStore(ABC):
+    """Collection of benchmark results indexed by (dataset, seed, method).
+
+    Subclasses implement `_refresh`, which brings the in-memory index up to date with
+    the underlying storage, and `_write`, which persists a batch of results and returns
+    them as they will be read back from storage.
+    """
+
+    def __init__(self):
+        self._index = {}
+
+    def __contains__(self, key):
+        self._refresh()
+        return key in self._index
+
+    def get(self, dataset, seed, method):
+        """Return the stored result for dataset, seed, method or None."""
+        self._refresh()
+        return self._index.get((dataset, seed, method))
+
+    def values(self):
+        """Return a list of all stored results."""
+        self._refresh()
+        return list(self._index.values())
+
+    def keys(self):
+        """Return the set of (dataset, seed, method) keys already stored."""
+        self._refresh()
+        return set(self._index)
+
+    def append(self, result):
+        """Append a single result. Raise if it has already been stored."""
+        self.append_many([result])
+
+    def append_many(self, results):
+        """Append a batch of results. Raise if any of them has already been stored."""
+        self._refresh()
+
+        keys = set()
+        for result in results:
+            key = (result["dataset"], result["seed"], result["method"])
+            if key in self._index or key in keys:
+                raise ValueError(f"Duplicate result {key[0]} {key[1]} {key[2]}.")
+            keys.add(key)
+
+        if not results:
+            return
+
+        for row in self._write(results):
+            self._index[(row["dataset"], row["seed"], row["method"])] = row
+
+    @abstractmethod
+    def _refresh(self):
+        ...
+
+    @abstractmethod
+    def _write(self, results):
+        ...
+
+
+class CSVResultStore(ResultStore):
+    """Result store backed by a csv file with one of the headers in `HEADERS`.
+
+    The file is parsed once. Afterwards, only bytes appended since the last read (e.g.,
+    by another process) are parsed. A trailing line without a newline is considered
+    incomplete and is ignored until it is completed. Writes are expected to be serialized
+    (see `TaskQueue.lock` for several nodes). An incomplete line at the time of writing
+    stems from a crashed writer and is removed. If the file was replaced, truncated or
+    rewritten, i.e., the bytes already parsed changed, it is parsed again. This is
+    checked by comparing a hash of these bytes whenever the size or modification time
+    of the file changed.
+
+    Parameters
+    ----------
+    file_path : str or pathlib.Path
+        Path to an existing csv file starting with one of the headers in `HEADERS`.
+        Results are written with the columns of the file's header. Values for
+        missing columns are left empty, except for `status`, which defaults to "ok".
+    """
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = Path(file_path)
+        self._reset()
+
+    def _reset(self):
+        if not self.file_path.exists():
+            raise ValueError(f"File {self.file_path} does not exist.")
+
+        with open(self.file_path, "r") as f:
+            header = f.readline()
+
+        versions = [version for version, h in HEADERS.items() if h == header]
+        if not versions:
+            raise ValueError(f"File {self.file_path} does not have the correct header.")
+
+        self.version = versions[0]
+        self.columns = header.strip().split(",")
+        self._offset = len(header.encode())
+        self._index = {}
+        # Hash of the first `_offset` bytes and (device, inode, size, modification time)
+        # of the file when they were last read or written by this store.
+        self._hash = hashlib.blake2b(header.encode())
+        self._stat = None
+
+    def _refresh(self):
+        stat = os.stat(self.file_path)
+
+        if self._stat is not None:
+            if _identity(stat) != _identity(self._stat) or stat.st_size < self._offset:
+                self._reset()  # Replaced or truncated. Start over.
+            elif _version(stat) == _version(self._stat):
+                return
+            elif not self._is_unchanged():
+                self._reset()  # Rewritten. Start over.
+
+        self._stat = stat
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.file_path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(stat.st_size - self._offset)
+
+        chunk = chunk[: chunk.rfind(b"\n") + 1]
+        if not chunk:
+            return
+
+        rows = pd.read_csv(io.BytesIO(chunk), header=None, names=self.columns)
+        for row in rows.to_dict("records"):
+            self._index[(row["dataset"], row["seed"], row["method"])] = row
+
+        self._offset += len(chunk)
+        self._hash.update(chunk)
+
+    def _is_unchanged(self):
+        """Whether the first `_offset` bytes of the file are the ones already parsed."""
+        file_hash = hashlib.blake2b()
+        with open(self.file_path, "rb") as f:
+            remaining = self._offset
+            while remaining > 0:
+                chunk = f.read(min(remaining, 2**20))
+                if not chunk:
+                    return False
+                file_hash.update(chunk)
+                remaining -= len(chunk)
+        return file_hash.digest() == self._hash.digest()
+
+    def _write(self, results):
+        lines = "".join(_format_row(result, self.columns) for result in results)
+        lines = lines.encode()
+
+        with open(self.file_path, "r+b") as f:
+            f.seek(self._offset)
+            tail = f.read()
+            if not tail.endswith(b"\n"):  # Incomplete line, e.g., of a crashed writer.
+                f.truncate(self._offset + tail.rfind(b"\n") + 1)
+
+            f.seek(0, os.SEEK_END)
+            in_sync = f.tell() == self._offset
+            f.write(lines)
+            # Only skip our own rows on the next refresh if nobody else appended in
+            # between. Otherwise, they are read again, which is harmless.
+            if in_sync and f.tell() == self._offset + len(lines):
+                f.flush()
+                self._offset = f.tell()
+                self._hash.update(lines)
+                self._stat = os.fstat(f.fileno())
+
+        rows = []
+        for result in results:
+            row = {}
+            for column in self.columns:
+                value = result.get(column, "ok" if column == "status" else None)
+                if value is not None and column in _CHANGEPOINT_COLUMNS:
+                    value = str(value)
+                row[column] = value
+            rows.append(row)
+        return rows
+
+
+def _identity(stat):
+    return stat.st_dev, stat.st_ino
+
+
+def _version(stat):
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _format_row(result, columns):
+    values = []
+    for column in columns:
+        value = result.get(column, "ok" if column == "status" else None)
+        if value is None:
+            values.append("")
+        elif column in _CHANGEPOINT_COLUMNS:
+            values.append(f'"{str(value)}"')
+        else:
+            values.append(str(value))
+    return ",".join(values) + "\n"
+
+
+def _is_ok(result):
+    """Whether the method of a result finished within limits.
+
+    Files with header versions 1 and 2 have no status column. There, results of runs
+    that exceeded limits have no estimated change points.
+    """
+    return result.get("status", "ok") == "ok" and isinstance(
+        result.get("estimated_changepoints"), (str, list)
+    )
+
+
+def get_result_store(file_path):
+    """Return the process-wide `CSVResultStore` for file_path.
+
+    Stores are created once per process and file, such that the file is only parsed
+    completely on first access.
+    """
+    key = str(Path(file_path).resolve())
+    if key not in _STORES:
+        _STORES[key] = CSVResultStore(file_path)
+    return _STORES[key]
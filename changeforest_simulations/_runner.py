@@ -0,0 +1,381 @@
+import logging
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+
+import numpy as np
+
+from changeforest_simulations._benchmark import benchmark_many
+from changeforest_simulations._cost import CostModel, _scaling_key
+from changeforest_simulations._results import _is_ok, get_result_store
+from changeforest_simulations._scenarios import get_scenario
+from changeforest_simulations._shared import attach_datasets, share_datasets
+from changeforest_simulations.methods import _r_pool
+
+logger = logging.getLogger(__file__)
+
+Task = namedtuple("Task", ["method", "dataset", "seed", "file_path"])
+
+# Methods predicted to take at most this many seconds are not run as a group of their
+# own. See `_split_expensive`.
+_MIN_SPLIT_TIME = 1.0
+
+
+def run_tasks(
+    tasks,
+    n_jobs=1,
+    verify=False,
+    cache=None,
+    profile=False,
+    timeout=None,
+    max_memory=None,
+    cost_model=None,
+    queue=None,
+    dtype=np.float64,
+    shared_memory=False,
+    r_pool=False,
+):
+    """Run benchmark tasks, possibly in parallel.
+
+    Tasks are grouped by dataset, seed and file_path, such that each time series is
+    simulated once per group (see `benchmark_many`). Tasks that have already been
+    benchmarked are skipped (or verified if verify is True). With n_jobs > 1, groups are
+    run on a process pool. Workers only compute results. These are streamed back to the
+    calling process, which is the only one writing to the result files.
+
+    If a method exceeded the time or memory limits on a dataset, it is not run on the
+    same dataset for other seeds. If the dataset has `n_observations` observations, the
+    method is also not run on the same scenario with more observations, e.g., if `ecp`
+    timed out for `dirichlet__n_observations=16000`, it is not run for
+    `dirichlet__n_observations=32000`. No results are recorded for tasks that are not
+    run. Aggregations mark the method as incomplete on the dataset based on the runs
+    that exceeded limits. Runs recorded with status "timeout" by earlier calls are
+    only taken into account if they ran for at least timeout seconds, and those with
+    status "oom" only if max_memory is not None, such that skipped tasks are run once
+    limits are increased.
+
+    With n_jobs > 1, the time of each task is predicted by `cost_model` and capped at
+    `timeout`. Methods predicted to take longer than the cheaper methods of their group
+    combined (e.g., `ecp` next to `change_in_mean_bs`) are run as groups of their own,
+    such that expensive methods on the same dataset and seed run concurrently. Their
+    time series is then simulated once per group, unless it is read from `cache`.
+    Groups are submitted longest-processing-time-first. This avoids a single long
+    task (e.g., `ecp` on a large dataset) running alone at the end.
+
+    Parameters
+    ----------
+    tasks : iterable of Task
+        Tasks to run.
+    n_jobs : int, optional, default=1
+        Number of worker processes. If 1, run tasks serially in the calling process.
+    verify : bool, optional, default=False
+        If a task has already been benchmarked, compare existing results against new
+        ones. Raise if they do not match.
+    cache : changeforest_simulations.SimulationCache, optional, default=None
+        Cache for simulated time series. See `simulate`.
+    profile : bool, optional, default=False
+        Whether to record profiling information. See `benchmark`.
+    timeout : float, optional, default=None
+        Time limit in seconds for each method. See `benchmark`.
+    max_memory : int, optional, default=None
+        Memory limit in bytes for each method. See `benchmark`.
+    cost_model : changeforest_simulations.CostModel, optional, default=None
+        Model to predict the time of each task. If None, fitted to the results already
+        stored in the tasks' files.
+    queue : changeforest_simulations.TaskQueue, optional, default=None
+        If not None, each task is claimed through the queue before it is run, such that
+        several nodes can work on the same tasks and result files. Tasks claimed by
+        other nodes are skipped. The queue is entered for the duration of the call.
+    dtype : numpy.dtype, optional, default=np.float64
+        Data type of simulated time series. See `benchmark`.
+    shared_memory : bool, optional, default=False
+        If True and n_jobs > 1, datasets the tasks' scenarios sample from are loaded
+        once and shared with the worker processes through shared memory (see
+        `share_datasets`), instead of being loaded by each worker.
+    r_pool : bool, optional, default=False
+        If True, each process running tasks (the calling one if n_jobs is 1, else each
+        worker process) runs methods in `R_METHODS` on a warm R worker (see `r_pool`).
+        R packages are then loaded once per worker instead of once per task, and the
+        R worker enforces timeout and max_memory instead of a subprocess per task.
+    """
+    groups = {}
+    for task in tasks:
+        key = (task.dataset, task.seed, task.file_path)
+        methods = groups.setdefault(key, [])
+        if task.method not in methods:
+            methods.append(task.method)
+
+    exceeded = _Exceeded(timeout, max_memory)
+    for file_path in {file_path for _, _, file_path in groups}:
+        exceeded.update(get_result_store(file_path).values())
+
+    if not verify:
+        for (dataset, seed, file_path), methods in groups.items():
+            existing = get_result_store(file_path).keys()
+            methods[:] = [m for m in methods if (dataset, seed, m) not in existing]
+
+    groups = [(key, methods) for key, methods in groups.items() if methods]
+    logger.info(f"Running {sum(len(methods) for _, methods in groups)} tasks.")
+
+    kwargs = {
+        "verify": verify,
+        "cache": cache,
+        "profile": profile,
+        "timeout": timeout,
+        "max_memory": max_memory,
+        "dtype": dtype,
+    }
+
+    if n_jobs == 1:
+        if r_pool and not _r_pool.is_running():
+            pool = _r_pool.r_pool()
+        else:
+            pool = nullcontext()
+
+        with queue or nullcontext(), pool:
+            for (dataset, seed, file_path), methods in groups:
+                methods = exceeded.drop_larger(methods, dataset)
+                methods = exceeded.drop_exceeded(methods, dataset)
+                methods = _claim(queue, methods, dataset, seed, file_path, verify)
+                if not methods:
+                    continue
+
+                results = benchmark_many(
+                    methods, dataset, seed, file_path=file_path, write=False, **kwargs
+                )
+                _write(queue, file_path, results)
+                _release(queue, methods, dataset, seed, file_path)
+                exceeded.update(results)
+        return
+
+    if cost_model is None:
+        file_paths = {file_path for (_, _, file_path), _ in groups}
+        cost_model = CostModel(
+            result
+            for file_path in file_paths
+            for result in get_result_store(file_path).values()
+        )
+    groups = _longest_first(
+        _split_expensive(groups, cost_model, timeout), cost_model, timeout
+    )
+
+    # Worker processes are long-lived. Start them fresh instead of forking the calling
+    # process, which has R embedded via rpy2.
+    context = multiprocessing.get_context("spawn")
+    if shared_memory:
+        datasets = [d for (dataset, _, _), _ in groups for d in _datasets(dataset)]
+        shared = share_datasets(datasets)
+    else:
+        shared = nullcontext([])
+
+    with queue or nullcontext(), shared as handles, ProcessPoolExecutor(
+        n_jobs,
+        mp_context=context,
+        initializer=_initialize_worker,
+        initargs=(logging.getLogger().level, handles, r_pool),
+    ) as executor:
+        pending = iter(groups)
+        futures = {}
+
+        def submit_next():
+            # Groups are submitted lazily, such that limits exceeded by earlier groups
+            # are taken into account.
+            for (dataset, seed, file_path), methods in pending:
+                methods = exceeded.drop_larger(methods, dataset)
+                methods = exceeded.drop_exceeded(methods, dataset)
+                methods = _claim(queue, methods, dataset, seed, file_path, verify)
+                if methods:
+                    future = executor.submit(
+                        benchmark_many,
+                        methods,
+                        dataset,
+                        seed,
+                        file_path=file_path,
+                        write=False,
+                        **kwargs,
+                    )
+                    futures[future] = (dataset, seed, file_path, methods)
+                    return
+
+        for _ in range(2 * n_jobs):
+            submit_next()
+
+        try:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results = future.result()
+                    dataset, seed, file_path, methods = futures.pop(future)
+                    _write(queue, file_path, results)
+                    _release(queue, methods, dataset, seed, file_path)
+                    exceeded.update(results)
+                    submit_next()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def _claim(queue, methods, dataset, seed, file_path, verify):
+    if queue is None:
+        return methods
+
+    store = get_result_store(file_path)
+    claimed = []
+    for method in methods:
+        if queue.claim(Task(method, dataset, seed, file_path)):
+            # Another node might have finished the task before we claimed it.
+            if verify or (dataset, seed, method) not in store:
+                claimed.append(method)
+            else:
+                queue.release(Task(method, dataset, seed, file_path))
+        else:
+            logger.info(f"Not running {method} on {dataset}. Claimed by another node.")
+    return claimed
+
+
+def _release(queue, methods, dataset, seed, file_path):
+    if queue is not None:
+        for method in methods:
+            queue.release(Task(method, dataset, seed, file_path))
+
+
+def _write(queue, file_path, results):
+    store = get_result_store(file_path)
+    if queue is None:
+        store.append_many(results)
+        return
+
+    with queue.lock(file_path):
+        # A stale claim of ours might have been taken over by another node.
+        keys = store.keys()
+        for result in results:
+            if (result["dataset"], result["seed"], result["method"]) in keys:
+                logger.warning(
+                    f"Not writing {result['method']} on {result['dataset']} with seed "
+                    f"{result['seed']}. Written by another node."
+                )
+        store.append_many(
+            [r for r in results if (r["dataset"], r["seed"], r["method"]) not in keys]
+        )
+
+
+def _split_expensive(groups, cost_model, timeout):
+    """Split off methods predicted to take longer than the cheaper ones combined.
+
+    Methods predicted to take at most `_MIN_SPLIT_TIME` seconds are never split off,
+    as simulating the time series again might take longer than running them.
+    """
+    split = []
+    for key, methods in groups:
+        costs = {
+            method: _cost(cost_model, timeout, method, key[0]) for method in methods
+        }
+        cheap = sorted(methods, key=costs.get)
+        expensive = []
+        while len(cheap) > 1:
+            cost = costs[cheap[-1]]
+            if cost <= _MIN_SPLIT_TIME or cost <= sum(
+                costs[method] for method in cheap if costs[method] < cost
+            ):
+                break
+            expensive.append(cheap.pop())
+
+        split.append((key, [method for method in methods if method in cheap]))
+        split.extend((key, [method]) for method in methods if method in expensive)
+    return split
+
+
+def _longest_first(groups, cost_model, timeout):
+    def cost(group):
+        (dataset, _, _), methods = group
+        return sum(_cost(cost_model, timeout, method, dataset) for method in methods)
+
+    # Sorting is stable. Without past timings, groups are run in the order given.
+    return sorted(groups, key=cost, reverse=True)
+
+
+def _cost(cost_model, timeout, method, dataset):
+    cost = cost_model.predict(method, dataset)
+    return cost if timeout is None else min(cost, timeout)
+
+
+class _Exceeded:
+    """Methods that exceeded time or memory limits, by dataset and by scenario.
+
+    Only runs that exceeded limits at least as strict as timeout and max_memory are
+    taken into account.
+    """
+
+    def __init__(self, timeout=None, max_memory=None):
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self._exceeded = set()
+        self._n_observations = {}
+
+    def update(self, results):
+        for result in results:
+            if _is_ok(result) or not self._exceeds_limits(result):
+                continue
+
+            self._exceeded.add((result["method"], result["dataset"]))
+
+            key, n_observations = _scaling_key(result["method"], result["dataset"])
+            if n_observations is not None:
+                self._n_observations[key] = min(
+                    self._n_observations.get(key, n_observations), n_observations
+                )
+
+    def drop_exceeded(self, methods, dataset):
+        """Drop methods that exceeded limits on dataset."""
+        kept = []
+        for method in methods:
+            if (method, dataset) in self._exceeded:
+                logger.info(
+                    f"Not running {method} on {dataset}. Exceeded limits before."
+                )
+            else:
+                kept.append(method)
+        return kept
+
+    def drop_larger(self, methods, dataset):
+        """Drop methods that exceeded limits on the scenario with fewer observations."""
+        kept = []
+        for method in methods:
+            key, n_observations = _scaling_key(method, dataset)
+            if (
+                n_observations is not None
+                and n_observations > self._n_observations.get(key, float("inf"))
+            ):
+                logger.info(
+                    f"Not running {method} on {dataset}. Exceeded limits before."
+                )
+            else:
+                kept.append(method)
+        return kept
+
+    def _exceeds_limits(self, result):
+        status = result.get("status")
+        if status == "oom":
+            return self.max_memory is not None
+        # Header versions 1 and 2 have no status. Treat their runs as timeouts.
+        time = result.get("time")
+        if self.timeout is None:
+            return False
+        return time is None or not np.isfinite(time) or time >= self.timeout
+
+
+def _initialize_worker(level, handles=(), r_pool=False):
+    logging.basicConfig(level=level)
+    attach_datasets(handles)
+    if r_pool:
+        _r_pool.start()
+
+
+def _datasets(scenario):
+    """Datasets a scenario samples from, or none if it is unknown."""
+    try:
+        return get_scenario(scenario)[0].datasets
+    except ValueError:
+        return ()
@@ -0,0 +1,100 @@
+from collections import namedtuple
+
+from changeforest_simulations.utils import string_to_kwargs
+
+Scenario = namedtuple(
+    "Scenario",
+    ["name", "simulate", "parameters", "normalize", "blocks", "cost", "datasets"],
+    defaults=({}, False, None, None, ()),
+)
+Scenario.__doc__ = """Simulation scenario registered with `register_scenario`."""
+
+_SCENARIOS = {}
+
+
+def register_scenario(
+    name,
+    simulate,
+    parameters=None,
+    normalize=False,
+    blocks=None,
+    cost=None,
+    datasets=None,
+    overwrite=False,
+):
+    """Register a scenario, such that `simulate(name, ...)` dispatches to it.
+
+    Parameters
+    ----------
+    name : str
+        Name of the scenario. Parameters are passed in scenario strings as
+        `name__key=value__...`, e.g., `iris-noise__n_observations=1000`.
+    simulate : callable
+        Called as `simulate(seed=seed, **parameters)`. Returns the change points,
+        including zero and `n`, and the time series.
+    parameters : dict, optional, default=None
+        Parameters of the scenario and their default values. Other parameters in
+        scenario strings raise a `ValueError`.
+    normalize : bool, optional, default=False
+        Whether to normalize time series returned by `simulate` with `normalize`.
+    blocks : callable, optional, default=None
+        Called as `blocks(seed=seed, block_size=block_size, **parameters)` by
+        `simulate_iter` to generate the time series lazily. Returns the change points
+        and an iterator over offsets and blocks. Only for scenarios with
+        `normalize=False`.
+    cost : callable, optional, default=None
+        Called as `cost(**parameters)`. Returns a hint on the cost of simulating from
+        and benchmarking on the scenario, e.g., the number of observations.
+    datasets : list of str, optional, default=None
+        Datasets (see `load`) the scenario samples from. These can be shared between
+        worker processes, see `share_datasets`.
+    overwrite : bool, optional, default=False
+        Whether to replace a scenario registered under the same name.
+    """
+    if name in _SCENARIOS and not overwrite:
+        raise ValueError(f"Scenario {name} is already registered.")
+    if "__" in name:
+        raise ValueError(f"Scenario names must not contain '__'. Got {name}.")
+    if normalize and blocks is not None:
+        raise ValueError("Only scenarios with normalize=False can have blocks.")
+
+    _SCENARIOS[name] = Scenario(
+        name,
+        simulate,
+        dict(parameters or {}),
+        normalize,
+        blocks,
+        cost,
+        tuple(datasets or ()),
+    )
+
+
+def get_scenario(scenario):
+    """Return the registered `Scenario` and all its parameters for a scenario string.
+
+    Parameters not set in the string take their default values.
+    """
+    name, kwargs = string_to_kwargs(scenario)
+
+    if name not in _SCENARIOS:
+        raise ValueError(f"Scenario {name} not supported.")
+    spec = _SCENARIOS[name]
+
+    unknown = kwargs.keys() - spec.parameters.keys()
+    if unknown:
+        raise ValueError(f"Unknown parameters {sorted(unknown)} for scenario {name}.")
+
+    return spec, {**spec.parameters, **kwargs}
+
+
+def list_scenarios():
+    """Return the names of all registered scenarios."""
+    return sorted(_SCENARIOS)
+
+
+def scenario_cost(scenario):
+    """Return the cost hint of a scenario string, or None if it has none."""
+    spec, parameters = get_scenario(scenario)
+    if spec.cost is None:
+        return None
+    return spec.cost(**parameters)
@@ -0,0 +1,111 @@
+import mmap
+import sys
+from collections import namedtuple
+from contextlib import contextmanager
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from changeforest_simulations import _load
+from changeforest_simulations._labeled_data import LabeledData
+
+_SharedDataset = namedtuple(
+    "_SharedDataset",
+    ["dataset", "name", "shape", "dtype", "y", "columns", "frame_columns", "index"],
+)
+
+# Shared memory blocks attached to by this process. Views into them are cached by
+# `_load`, so they must stay open for the lifetime of the process.
+_attached = []
+
+
+@contextmanager
+def share_datasets(datasets):
+    """Publish datasets in shared memory for worker processes on the same node.
+
+    Features of each dataset are copied once into a `multiprocessing.shared_memory`
+    block. Pass the yielded handles to `attach_datasets` in worker processes, e.g., via
+    the `initializer` of a process pool. `load` and `load_labeled` then return
+    read-only views into the shared blocks instead of reading a copy per worker. The
+    blocks are removed on exit, so workers must have finished by then. Features held
+    in memory by this process are dropped from its cache once copied.
+
+    Parameters
+    ----------
+    datasets : iterable of str
+        Names of datasets, see `load`.
+    """
+    blocks, handles = [], []
+    try:
+        for dataset in dict.fromkeys(datasets):
+            entry = _load._load_entry(dataset, "class")
+            X = entry.data.X
+
+            block = SharedMemory(create=True, size=max(X.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(X.shape, dtype=X.dtype, buffer=block.buf)[:] = X
+            if not _is_memory_mapped(X):
+                # Else, this process would hold the features twice. Memory-mapped
+                # binary copies are backed by the page cache and are kept.
+                _load._cache.remove((dataset, "class"))
+
+            handles.append(
+                _SharedDataset(
+                    dataset,
+                    block.name,
+                    X.shape,
+                    X.dtype.str,
+                    entry.data.y,
+                    entry.data.columns,
+                    entry.columns,
+                    entry.index,
+                )
+            )
+        yield handles
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def attach_datasets(handles):
+    """Use datasets published with `share_datasets` in `load` and `load_labeled`."""
+    for handle in handles:
+        block = _attach(handle.name)
+        _attached.append(block)
+
+        X = np.ndarray(handle.shape, dtype=handle.dtype, buffer=block.buf)
+        data = LabeledData(X, handle.y, columns=list(handle.columns))
+        entry = _load._Entry(_load._read_only(data), handle.frame_columns, handle.index)
+        _load._cache.put((handle.dataset, "class"), entry)
+
+
+def _is_memory_mapped(array):
+    while array is not None:
+        if isinstance(array, mmap.mmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def _attach(name):
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+
+    # Before Python 3.13, attaching registers the block with the resource tracker,
+    # which would unlink it when this process exits, while other processes still use
+    # it. Unregistering afterwards would also drop the registration of the publishing
+    # process if both share a tracker, e.g., for spawned workers. Skip registration
+    # instead. See https://github.com/python/cpython/issues/82300.
+    register = resource_tracker.register
+    resource_tracker.register = _register_unless_shared_memory
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _register_unless_shared_memory(name, rtype, register=resource_tracker.register):
+    if rtype != "shared_memory":
+        register(name, rtype)
@@ -1,32 +1,164 @@
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
 from warnings import warn
 
 import numpy as np
-import pandas as pd
 from scipy.stats import median_abs_deviation
 
-from changeforest_simulations._load import DATASETS, load
-from changeforest_simulations.utils import string_to_kwargs
+from changeforest_simulations._labeled_data import LabeledData
+from changeforest_simulations._load import DATASETS, load_labeled
+from changeforest_simulations._scenarios import get_scenario, register_scenario
 
 
-def normalize(X):
-    """Normalize time series by median pairwise distances."""
-    pairwise_distances = X[1:, :] - X[:-1, :]
+def normalize(X, copy=True, sample_size=None, block_size=1, random_state=0, dtype=None):
+    """Normalize time series by median pairwise distances.
+
+    The median absolute deviation (MAD) of pairwise distances is computed for blocks
+    of `block_size` columns at a time, using a single scratch array of shape
+    `(n - 1, block_size)` that is partitioned in place. With `copy=False`, `X` is
+    divided in place, such that peak memory stays close to the size of `X`.
+
+    Parameters
+    ----------
+    X : numpy.ndarray of shape (n, p)
+        Time series. With `copy=False`, a writable floating point array, e.g., a
+        memory-mapped array.
+    copy : bool, optional, default=True
+        Whether to return a normalized copy instead of normalizing `X` in place.
+    sample_size : int, optional, default=None
+        If not `None`, approximate the MAD from a uniform random sample of that many
+        pairwise distances with `MADSketch`, reading `X` in blocks of rows.
+    block_size : int, optional, default=1
+        Number of columns for which the MAD is computed at once.
+    random_state : int, optional, default=0
+        Seed for the sample if `sample_size` is not `None`.
+    dtype : numpy.dtype, optional, default=None
+        Data type of the normalized time series. If different from that of `X`, the
+        MAD is computed in the precision of `X` and the result is written to a new
+        array, also with `copy=False`.
+    """
+    if sample_size is not None:
+        sketch = MADSketch(X.shape[1], sample_size, random_state=random_state)
+        for offset in range(0, X.shape[0], 2**16):
+            sketch.update(X[offset : offset + 2**16])
+        mad = sketch.mad()
+    else:
+        mad = _pairwise_distances_mad(X, block_size)
+
+    if dtype is not None and np.dtype(dtype) != X.dtype:
+        return np.divide(X, mad, out=np.empty(X.shape, dtype=dtype), casting="unsafe")
+
+    if copy:
+        return X / mad
+
+    X /= mad
+    return X
+
+
+def _pairwise_distances_mad(X, block_size):
     # If the x_i are i.i.d. N(0, 1 \sigma), then the x_i - x_{i-1} are N(0, 2 \sigma).
     # Since sqrt(2) * MAD(x_i) is an estimator for \sigma, so is MAD(x_i - x_{i-1}).
-    mad = median_abs_deviation(pairwise_distances, axis=0)
+    n, p = X.shape
+    mad = np.empty(p)
+    scratch = np.empty((max(n - 1, 0), min(block_size, p)), dtype=np.result_type(X))
+
+    for start in range(0, p, block_size):
+        columns = slice(start, min(start + block_size, p))
+        out = scratch[:, : columns.stop - start]
+        np.subtract(X[1:, columns], X[:-1, columns], out=out)
+        # np.median(..., overwrite_input=True) partitions out in place. The absolute
+        # deviations from the median do not depend on the order of rows.
+        median = np.median(out, axis=0, overwrite_input=True)
+        np.abs(np.subtract(out, median, out=out), out=out)
+        mad[columns] = np.median(out, axis=0, overwrite_input=True)
+
     mad[mad == 0] = 1
-    return X / mad
+    return mad
+
 
+class MADSketch:
+    """Approximate MAD of pairwise distances of a time series streamed in blocks.
 
-def simulate(scenario, seed=0):
+    Keeps a uniform random sample of `sample_size` pairwise distances
+    `x_i - x_{i-1}` as a bottom-k sketch: each pairwise distance is assigned a random
+    key and the `sample_size` ones with smallest keys are kept. Memory is thus
+    `O(sample_size * p)`, independent of the length of the time series.
+
+    Parameters
+    ----------
+    n_features : int
+        Number of columns of the time series.
+    sample_size : int, optional, default=65536
+        Number of pairwise distances to keep.
+    random_state : int, optional, default=0
+        Seed for the random keys.
+    """
+
+    def __init__(self, n_features, sample_size=2**16, random_state=0):
+        self.sample_size = sample_size
+        self._rng = np.random.default_rng(random_state)
+        self._keys = np.empty(0)
+        self._sample = np.empty((0, n_features))
+        self._last = None
+
+    def update(self, block):
+        """Add the next block of rows of the time series."""
+        block = np.asarray(block)
+        if len(block) == 0:
+            return self
+
+        if self._last is not None:
+            block = np.concatenate([self._last, block])
+        self._last = block[-1:].copy()
+
+        keys = self._rng.random(len(block) - 1)
+        if len(self._keys) == self.sample_size:
+            # Only pairwise distances with keys below the current maximum can enter.
+            (candidates,) = np.nonzero(keys < self._keys.max())
+        else:
+            candidates = np.arange(len(keys))
+
+        keys = np.concatenate([self._keys, keys[candidates]])
+        sample = np.concatenate(
+            [self._sample, block[candidates + 1] - block[candidates]]
+        )
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size - 1)[: self.sample_size]
+            keys, sample = keys[keep], sample[keep]
+
+        self._keys, self._sample = keys, sample
+        return self
+
+    def mad(self):
+        """Approximate MAD of pairwise distances per column. Zeros are set to 1."""
+        if len(self._sample) == 0:
+            return np.ones(self._sample.shape[1])
+        mad = median_abs_deviation(self._sample, axis=0)
+        mad[mad == 0] = 1
+        return mad
+
+
+def simulate(scenario, seed=0, cache=None, dtype=np.float64):
     """Simulate time series with change points from scenario.
 
     Parameters
     ----------
     scenario : str
-        One of ...
+        Name of a registered scenario (see `list_scenarios`), optionally followed by
+        parameters as `__key=value`, e.g., `iris-noise__n_observations=1000`.
     seed: int, optional, default=0
         Random seed for reproducibility.
+    cache : changeforest_simulations.SimulationCache, optional, default=None
+        If not None, look up the simulated time series in the cache before simulating
+        and store it afterwards. Cached time series are read-only memory maps.
+    dtype : numpy.dtype, optional, default=np.float64
+        Data type of the simulated time series. Time series are simulated and
+        normalized in double precision and then cast, such that results for
+        `np.float32` equal those for `np.float64`, cast to `np.float32`. Scenarios
+        with blocks are cast block by block.
 
     Returns
     -------
@@ -35,36 +167,140 @@ def simulate(scenario, seed=0):
     numpy.ndarray
         Simulated time series.
     """
-    scenario, kwargs = string_to_kwargs(scenario)
-
-    if scenario in DATASETS:
-        change_points, data = simulate_from_data(load(scenario), seed=seed, **kwargs)
-        return change_points, normalize(data)
-    elif scenario.endswith("-no-change"):
-        changepoints, data = simulate_no_change(scenario, seed=seed)
-        return changepoints, normalize(data)
-    elif scenario.endswith("-noise"):
-        changepoints, data = simulate_with_noise(scenario, seed=seed, **kwargs)
-        return changepoints, data
-    elif scenario == "repeated-covertype":
-        change_points, data = simulate_repeated_covertype(seed=seed)
-        return change_points, normalize(data)
-    elif scenario == "repeated-dry-beans":
-        change_points, data = simulate_repeated_dry_beans(seed=seed)
-        return change_points, normalize(data)
-    elif scenario == "repeated-wine":
-        change_points, data = simulate_repeated_wine(seed=seed)
-        return change_points, normalize(data)
-    elif scenario == "dirichlet":
-        return simulate_dirichlet(seed=seed, **kwargs)
-    elif scenario == "change_in_mean":
-        return simulate_change_in_mean(seed=seed)
-    elif scenario == "change_in_covariance":
-        return simulate_change_in_covariance(seed=seed, version="old")
-    elif scenario == "change_in_covariance_new":
-        return simulate_change_in_covariance(seed=seed, version="new")
-    else:
-        raise ValueError(f"Scenario {scenario} not supported.")
+    if cache is None:
+        return _simulate(scenario, seed, dtype)
+
+    cached = cache.get(scenario, seed, dtype=dtype)
+    if cached is not None:
+        return cached
+
+    changepoints, X = _simulate(scenario, seed, dtype)
+    cache.put(scenario, seed, changepoints, X, dtype=dtype)
+    return changepoints, X
+
+
+def simulate_iter(scenario, seed=0, block_size=2**16, cache=None):
+    """Simulate time series with change points from scenario in blocks.
+
+    For scenarios registered with `blocks`, e.g., `dirichlet` and `*-noise`, blocks
+    are generated lazily, such that arbitrarily long time series can be processed
+    with constant memory. Other scenarios are simulated at once and returned in
+    slices. Concatenating the blocks results in the time series returned by
+    `simulate`.
+
+    Parameters
+    ----------
+    scenario : str
+        See `simulate`.
+    seed: int, optional, default=0
+        Random seed for reproducibility.
+    block_size : int, optional, default=2 ** 16
+        Number of observations per block. The last block might be shorter.
+    cache : changeforest_simulations.SimulationCache, optional, default=None
+        If not None and the time series is cached, blocks are slices of the cached
+        memory map. Time series simulated lazily are not added to the cache.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array with changepoints, including zero and `n`.
+    iterator of (int, numpy.ndarray)
+        Offsets and blocks of the simulated time series.
+    """
+    spec, parameters = get_scenario(scenario)
+    cached = cache.get(scenario, seed) if cache is not None else None
+
+    if cached is None and spec.blocks is not None:
+        return spec.blocks(seed=seed, block_size=block_size, **parameters)
+
+    changepoints, X = cached if cached is not None else simulate(scenario, seed=seed)
+    blocks = (
+        (offset, X[offset : offset + block_size])
+        for offset in range(0, len(X), block_size)
+    )
+    return changepoints, blocks
+
+
+def simulate_many(scenario, seeds, n_jobs=1, cache=None):
+    """Simulate time series with change points from scenario for many seeds.
+
+    Source datasets are loaded and grouped by class once per process (see
+    `load_labeled`) and reused for all seeds. Time series are only simulated when
+    accessed. When iterating with `n_jobs > 1`, up to `2 * n_jobs` time series are
+    simulated ahead on a thread pool.
+
+    Parameters
+    ----------
+    scenario : str
+        See `simulate`.
+    seeds : iterable of int
+        Random seeds.
+    n_jobs : int, optional, default=1
+        Number of threads used when iterating.
+    cache : changeforest_simulations.SimulationCache, optional, default=None
+        See `simulate`.
+
+    Returns
+    -------
+    collections.abc.Sequence
+        Sequence of tuples `(changepoints, time_series)` as returned by `simulate`,
+        one for each seed.
+    """
+    return _Simulations(scenario, list(seeds), n_jobs, cache)
+
+
+class _Simulations(Sequence):
+    def __init__(self, scenario, seeds, n_jobs, cache):
+        self.scenario = scenario
+        self.seeds = seeds
+        self.n_jobs = n_jobs
+        self.cache = cache
+
+    def __len__(self):
+        return len(self.seeds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _Simulations(
+                self.scenario, self.seeds[index], self.n_jobs, self.cache
+            )
+        return simulate(self.scenario, seed=self.seeds[index], cache=self.cache)
+
+    def __iter__(self):
+        if self.n_jobs == 1:
+            for seed in self.seeds:
+                yield simulate(self.scenario, seed=seed, cache=self.cache)
+            return
+
+        with ThreadPoolExecutor(self.n_jobs) as executor:
+            futures = deque()
+            for seed in self.seeds:
+                futures.append(
+                    executor.submit(simulate, self.scenario, seed, self.cache)
+                )
+                if len(futures) > 2 * self.n_jobs:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+
+
+def _simulate(scenario, seed, dtype=np.float64):
+    spec, parameters = get_scenario(scenario)
+
+    if np.dtype(dtype) != np.float64 and spec.blocks is not None:
+        # Small blocks keep double precision temporaries small.
+        changepoints, blocks = spec.blocks(seed=seed, block_size=2**12, **parameters)
+        X = None
+        for offset, block in blocks:
+            if X is None:
+                X = np.empty((changepoints[-1], block.shape[1]), dtype=dtype)
+            X[offset : offset + len(block)] = block
+        return changepoints, X
+
+    changepoints, X = spec.simulate(seed=seed, **parameters)
+    if spec.normalize:
+        return changepoints, normalize(X, copy=False, dtype=dtype)
+    return changepoints, X.astype(dtype, copy=False)
 
 
 def simulate_no_change(scenario, seed=0, class_label="class"):
@@ -91,15 +327,10 @@ def simulate_no_change(scenario, seed=0, class_label="class"):
     elif scenario == "dirichlet-no-change":
         X = simulate_dirichlet(seed=seed)[1][370:520, :]
     else:
-        data = load(scenario[:-10])
-        values, counts = np.unique(data[class_label], return_counts=True)
-        most_frequent = values[np.argmax(counts)]
-
-        X = (
-            data[lambda x: x[class_label] == most_frequent]
-            .drop(columns=class_label)
-            .to_numpy()
-        )
+        data = load_labeled(scenario[:-10], class_label=class_label)
+        most_frequent = data.classes[np.argmax(np.bincount(data.codes))]
+
+        X = data.X[data.rows(most_frequent)]
         rng.shuffle(X)  # This only shuffles along the first axis.
 
     return np.array([0, len(X)]), X
@@ -114,41 +345,91 @@ def simulate_with_noise(
     n_segments=100,
     minimal_relative_segment_length=None,
 ):
+    n_features = load_labeled(scenario[:-6], class_label=class_label).X.shape[1]
+    out = np.empty((n_observations, n_features))
+
+    changepoints, blocks = _with_noise_blocks(
+        scenario,
+        seed=seed,
+        block_size=n_observations,
+        class_label=class_label,
+        signal_to_noise=signal_to_noise,
+        n_observations=n_observations,
+        n_segments=n_segments,
+        minimal_relative_segment_length=minimal_relative_segment_length,
+        out=out,
+    )
+    for _ in blocks:
+        pass
+    return changepoints, out
+
+
+def _with_noise_blocks(
+    scenario,
+    seed=0,
+    block_size=2**16,
+    class_label="class",
+    signal_to_noise=1,
+    n_observations=10000,
+    n_segments=100,
+    minimal_relative_segment_length=None,
+    out=None,
+):
+    """Same as `simulate_with_noise`, but return an iterator over blocks.
+
+    Noise is drawn block by block, which results in the same draws as drawing it at
+    once. If `out` is passed, blocks are written into and yielded as views of `out`.
+    """
     if minimal_relative_segment_length is None:
         minimal_relative_segment_length = 1 / n_segments / 10
 
     rng = np.random.default_rng(seed)
 
-    data = load(scenario[:-6])
-
-    y = data[class_label].to_numpy()
-
-    variances = (  # Compute variances separately for each class, take weighted mean.
-        data.groupby(class_label).var() * data.groupby(class_label).count()
-    ).sum(axis=0) / (data.shape[0] - data[class_label].nunique())
-    X = (data.drop(columns=class_label) / variances.apply(np.sqrt)).to_numpy()
+    data = load_labeled(scenario[:-6], class_label=class_label)
 
     segment_lengths = _exponential_segment_lengths(
         n_segments, n_observations, minimal_relative_segment_length, seed
     )
-    indices = np.array([], dtype="int")
 
     for _ in range(5):
         try:
-            indices = _get_indices(segment_lengths, y, rng, True)
+            indices = _get_indices(segment_lengths, data, rng, True)
         except ValueError:
             continue
 
-        noise = rng.normal(0, 1 / signal_to_noise, (len(indices), X.shape[1]))
-
         changepoints = np.append([0], segment_lengths.cumsum())
-        time_series = data.iloc[indices].drop(columns=class_label).to_numpy() + noise
 
-        return changepoints, time_series
+        def blocks():
+            for offset in range(0, len(indices), block_size):
+                block_indices = indices[offset : offset + block_size]
+                if out is None:
+                    block = np.empty((len(block_indices), data.X.shape[1]))
+                else:
+                    block = out[offset : offset + len(block_indices)]
+                _gather_with_noise(
+                    data.X, block_indices, 1 / signal_to_noise, rng, block
+                )
+                yield offset, block
+
+        return changepoints, blocks()
 
     raise ValueError("Not enough data")
 
 
+def _gather_with_noise(X, indices, scale, rng, out, chunk_size=2**12):
+    """Write `X[indices] + rng.normal(0, scale, out.shape)` into out.
+
+    Noise is drawn directly into out, which gives the same draws as `rng.normal`.
+    Rows of `X` are gathered in chunks of `chunk_size` rows to bound temporaries.
+    """
+    rng.standard_normal(out=out)
+    out *= scale
+    for start in range(0, len(indices), chunk_size):
+        chunk = out[start : start + chunk_size]
+        chunk += X[indices[start : start + chunk_size]]
+    return out
+
+
 def _get_indices(segment_lengths, y, rng, replace=True):
     """
     Get indices for segments of lengths `segment_lengths`.
@@ -158,42 +439,54 @@ def _get_indices(segment_lengths, y, rng, replace=True):
     segment_lengths : array-like of int
         For consequtive values `start`, `end` of `segment_lengths`, indices
         `indices[start:stop]` will be unique and correspond to a single value in `y`.
-    y : array-like
+    y : array-like or changeforest_simulations.LabeledData
         Array-like with class labels. For each segment, indices of that segment
-        correspond to entries in `y` with the same value.
+        correspond to entries in `y` with the same value. If `LabeledData`, its rows
+        grouped by class are reused.
     rng : np.random.RandomState
         Random number generator.
     replace : bool, optional, default=True
         Whether not to recycle indices for separate segments.
     """
-    segment_id = None
-    indices = np.array([], dtype="int")
-    value_counts = pd.value_counts(y)
-    available_indices = np.ones(len(y), dtype=np.bool_)
+    if not isinstance(y, LabeledData):
+        y = LabeledData(np.empty((len(y), 0)), y)
+
+    # Classes are drawn from in the order of `pd.value_counts(y)`.
+    labels = y.value_counts.index.to_numpy()
+    counts = y.value_counts.to_numpy().copy()
+    codes = np.searchsorted(y.classes, labels)
+    # Indices of rows per class, in increasing order. If not replace, used indices
+    # are removed from the pool of their class, which keeps it in increasing order.
+    pools = [y.indices[y.indptr[code] : y.indptr[code + 1]] for code in codes]
+
+    indices = np.empty(np.sum(segment_lengths, dtype=np.int_), dtype=np.int_)
+    previous = None
+    start = 0
 
     for segment_length in segment_lengths:
-        available_segments = value_counts[lambda x: x.index != segment_id]
+        available = np.arange(len(labels)) != previous
         if not replace:
-            available_segments = available_segments[
-                lambda x: (x >= segment_length).to_numpy()
-            ]
+            available &= counts >= segment_length
 
-        if len(available_segments) == 0:
+        available = np.flatnonzero(available)
+        if len(available) == 0:
             raise ValueError("Not enough data.")
 
-        segment_id = rng.choice(available_segments.index, 1)[0]
+        previous = rng.choice(available, 1)[0]
 
-        new_indices = rng.choice(
-            np.flatnonzero((y == segment_id) & available_indices),
-            segment_length,
-            replace=replace,
-        )
+        # Same draws as `rng.choice(pools[previous], ...)`, which draws positions in
+        # the pool the same way.
+        pool = pools[previous]
+        positions = rng.choice(len(pool), segment_length, replace=replace)
+        indices[start : start + segment_length] = pool[positions]
 
         if not replace:
-            value_counts.loc[segment_id] -= segment_length
-            available_indices[new_indices] = False
+            counts[previous] -= segment_length
+            keep = np.ones(len(pool), dtype=bool)
+            keep[positions] = False
+            pools[previous] = pool[keep]
 
-        indices = np.concatenate([indices, new_indices])
+        start += segment_length
 
     return indices
 
@@ -209,10 +502,10 @@ def simulate_from_data(
 
     Parameters
     ----------
-    data : pandas.DataFrame
-        DataFrame containing dataset for (multi-class) classification.
+    data : pandas.DataFrame or changeforest_simulations.LabeledData
+        Dataset for (multi-class) classification.
     class_label : str, optional, default="class"
-        Column name of class labels in data.
+        Column name of class labels in data. Ignored if data is `LabeledData`.
     segment_sizes : list, optional, default=None
         List of sizes of segments to simulate. If `None`, segment sizes correspond to
         value counts of labels in data.
@@ -232,9 +525,10 @@ def simulate_from_data(
     """
     rng = np.random.default_rng(seed)
 
-    data = data.reset_index(drop=True)
+    if not isinstance(data, LabeledData):
+        data = LabeledData.from_frame(data, class_label=class_label)
 
-    value_counts = data[class_label].value_counts()
+    value_counts = data.value_counts
 
     if segment_sizes is None:
         if minimal_relative_segment_length is not None:
@@ -246,34 +540,26 @@ def simulate_from_data(
         rng.shuffle(idx)
         value_counts = value_counts.iloc[idx]
 
-        indices = np.array([], dtype=np.int_)
-
-        for label, segment_size in value_counts.to_dict().items():
-            indices = np.append(
-                indices,
-                rng.choice(
-                    data[lambda x: x[class_label] == label].index,
-                    segment_size,
-                    replace=False,
-                ),
-            )
+        indices = np.concatenate(
+            [
+                rng.choice(data.rows(label), segment_size, replace=False)
+                for label, segment_size in value_counts.items()
+            ]
+        )
 
         segment_sizes = value_counts.to_numpy()
 
-        return (
-            np.append([0], segment_sizes.cumsum()),
-            data.iloc[indices].drop(columns=class_label).to_numpy(),
-        )
+        return np.append([0], segment_sizes.cumsum()), data.X[indices]
 
     else:
         for _ in range(5):
             try:
-                indices = _get_indices(segment_sizes, data[class_label].to_numpy(), rng)
+                indices = _get_indices(segment_sizes, data, rng)
             except ValueError:
                 continue
 
             changepoints = np.append([0], np.array(segment_sizes).cumsum())
-            time_series = data.iloc[indices].drop(columns=class_label).to_numpy()
+            time_series = data.X[indices]
 
             return changepoints, time_series
 
@@ -285,13 +571,71 @@ def simulate_dirichlet(
     n_segments=None,
     n_observations=None,
     minimal_relative_segment_length=None,
+    out=None,
+    dtype=np.float64,
+    chunk_size=2**16,
 ):
     """
     Simulate histogram-valued dataset as described in Scenario 3, 6.1, [1].
 
+    Segments are generated in chunks of at most `chunk_size` observations and written
+    into `out`. For very long time series, `out` can be a path, such that the time series
+    is written to a memory-mapped `.npy` file and never held in memory completely.
+    Results do not depend on `chunk_size`. For `dtype=np.float32`, they are equal to
+    those for `np.float64`, cast to `np.float32`.
+
+    Parameters
+    ----------
+    out : numpy.ndarray, str or pathlib.Path, optional, default=None
+        Array of shape `(n_observations, 20)` to write the time series into, e.g., a
+        `numpy.memmap`. If a path, a memory-mapped `.npy` file is created there. If
+        None, a new array is allocated.
+    dtype : numpy.dtype, optional, default=np.float64
+        Data type of the time series if out is not an array.
+    chunk_size : int, optional, default=2 ** 16
+        Maximal number of observations generated at once.
+
     [1] S. Arlot, A. Celisse, Z. Harchaoui. A Kernel Multiple Change-point Algorithm
         via Model Selection, 2019
     """
+    changepoints, blocks = _dirichlet_blocks(
+        seed=seed,
+        n_segments=n_segments,
+        n_observations=n_observations,
+        minimal_relative_segment_length=minimal_relative_segment_length,
+        block_size=chunk_size,
+        dtype=dtype,
+    )
+
+    shape = (changepoints[-1], 20)
+    if out is None:
+        X = np.empty(shape, dtype=dtype)
+    elif isinstance(out, (str, Path)):
+        X = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=shape)
+    elif out.shape != shape:
+        raise ValueError(f"out must be of shape {shape}. Got {out.shape}.")
+    else:
+        X = out
+
+    for offset, block in blocks:
+        X[offset : offset + len(block), :] = block
+
+    return changepoints, X
+
+
+def _dirichlet_blocks(
+    seed=0,
+    n_segments=None,
+    n_observations=None,
+    minimal_relative_segment_length=None,
+    block_size=2**16,
+    dtype=np.float64,
+):
+    """Same as `simulate_dirichlet`, but return an iterator over blocks.
+
+    Segments overlapping with a block are drawn in order. Draws for consecutive parts
+    of a segment are identical to those for the whole segment.
+    """
     if n_segments is not None or n_observations is not None:
         if minimal_relative_segment_length is None:
             minimal_relative_segment_length = 1 / n_segments / 10
@@ -300,18 +644,35 @@ def simulate_dirichlet(
         )
         changepoints = np.array([0] + segment_sizes.cumsum())
     else:
-        changepoints = [0, 100, 130, 220, 320, 370, 520, 620, 740, 790, 870, 1000]
+        changepoints = np.array(
+            [0, 100, 130, 220, 320, 370, 520, 620, 740, 790, 870, 1000]
+        )
 
     d = 20
     n_segments = len(changepoints) - 1
     rng = np.random.default_rng(seed)
     params = rng.uniform(0, 0.2, n_segments * d).reshape((n_segments, d))
 
-    X = np.zeros((changepoints[-1], d))
-    for idx, (start, end) in enumerate(zip(changepoints[:-1], changepoints[1:])):
-        X[start:end, :] = rng.dirichlet(params[idx, :], end - start)
+    def blocks():
+        for offset in range(0, changepoints[-1], block_size):
+            stop = min(offset + block_size, changepoints[-1])
+            # Rows not covered by a segment are zero.
+            block = np.zeros((stop - offset, d), dtype=dtype)
+
+            first = max(np.searchsorted(changepoints, offset, side="right") - 1, 0)
+            for idx in range(first, n_segments):
+                start = max(changepoints[idx], offset)
+                end = min(changepoints[idx + 1], stop)
+                if start >= stop:
+                    break
+                if end > start:
+                    block[start - offset : end - offset, :] = rng.dirichlet(
+                        params[idx, :], end - start
+                    )
+
+            yield offset, block
 
-    return np.array(changepoints), X
+    return changepoints, blocks()
 
 
 def simulate_change_in_mean(seed=0):
@@ -388,7 +749,7 @@ def simulate_change_in_covariance(seed=0, version="new"):
 
 def simulate_repeated_covertype(seed=0):
     return simulate_from_data(
-        data=load("covertype"),
+        data=load_labeled("covertype"),
         segment_sizes=_exponential_segment_lengths(100, 100000, 0.001, seed),
         minimal_relative_segment_length=None,
         seed=seed,
@@ -397,7 +758,7 @@ def simulate_repeated_covertype(seed=0):
 
 def simulate_repeated_dry_beans(seed=0):
     return simulate_from_data(
-        data=load("dry-beans"),
+        data=load_labeled("dry-beans"),
         segment_sizes=_exponential_segment_lengths(100, 5000, 0.001, seed),
         minimal_relative_segment_length=None,
         seed=seed,
@@ -406,7 +767,7 @@ def simulate_repeated_dry_beans(seed=0):
 
 def simulate_repeated_wine(seed=0):
     return simulate_from_data(
-        data=load("wine"),
+        data=load_labeled("wine"),
         segment_sizes=_exponential_segment_lengths(100, 5000, 0.001, seed),
         minimal_relative_segment_length=None,
         seed=seed,
@@ -430,43 +791,177 @@ def _exponential_segment_lengths(
         returned will be equal to this.
     minimal_relative_segment_length : float, optional, default=0.01
         All segments will be at least `n * minimal_relative_segment_length` long.
-    seed: int, optional, default=0
-        Random seed for reproducibility.
+    seed: int or array-like of int, optional, default=0
+        Random seed for reproducibility. If array-like, segment lengths are sampled
+        for each seed.
 
     Returns
     -------
     numpy.ndarray
-        Array with segment lengths.
+        Array with segment lengths. Of shape `(len(seed), n_segments)` if seed is
+        array-like.
 
     """
-    rng = np.random.default_rng(seed)
+    seeds = np.asarray(seed)
 
-    expo = rng.exponential(scale=1, size=n_segments)
-    expo = expo * (1 - minimal_relative_segment_length * n_segments) / expo.sum()
+    expo = np.empty((seeds.size, n_segments))
+    for idx, seed_ in enumerate(seeds.flat):
+        rng = np.random.default_rng(seed_)
+        expo[idx, :] = rng.exponential(scale=1, size=n_segments)
+    expo = expo.reshape(seeds.shape + (n_segments,))
+
+    scale = 1 - minimal_relative_segment_length * n_segments
+    expo = expo * scale / expo.sum(axis=-1, keepdims=True)
     expo = expo + minimal_relative_segment_length
-    assert np.abs(expo.sum() - 1) < 1e-12
+    assert np.all(np.abs(expo.sum(axis=-1) - 1) < 1e-12)
     assert np.min(expo) >= minimal_relative_segment_length
     return _cascade_round(expo * n_observations)
 
 
+# Number of values `_cascade_round` corrects before falling back to a loop.
+_MAX_CORRECTIONS = 8
+
+
 def _cascade_round(x):
     """Round floats in x to near integer, preserving their sum.
 
     Inspired by
     https://stackoverflow.com/questions/792460/how-to-round-floats-to-integers-while-preserving-their-sum
 
+    Each value is rounded after adding the remainder of all previous ones. The sum of
+    the first i rounded values is thus the rounded sum of the first i values, except
+    if the latter is close to .5, where floating point errors decide. Rounded values
+    are computed as differences of rounded cumulative sums. Then, the remainders are
+    recomputed as in a sequential loop, and the first value that the loop would round
+    differently is corrected. This is repeated for the remaining values up to
+    `_MAX_CORRECTIONS` times. Afterwards, e.g., for many exact ties, the remaining
+    values are rounded in a loop. If x is 2-D, each row is rounded separately.
     """
+    if x.ndim == 2:
+        return np.array([_cascade_round(row) for row in x], dtype=np.int_).reshape(
+            x.shape
+        )
 
     if np.abs(x.sum() - np.round(x.sum())) > 1e-8:
         raise ValueError("Values in x must sum to an integer value.")
 
-    x_rounded = np.zeros(len(x), dtype=np.int_)
-    remainder = 0
+    x_rounded = np.diff(np.round(np.cumsum(x)), prepend=0).astype(np.int_)
+
+    # x[:start] is rounded as in the loop, which passes on remainder to x[start].
+    start, remainder = 0, 0.0
+    for _ in range(_MAX_CORRECTIONS):
+        # Remainders as accumulated by `remainder += x[idx] - x_rounded[idx]`.
+        remainders = np.cumsum(np.append(remainder, x[start:] - x_rounded[start:]))
+        mismatches = np.flatnonzero(
+            np.round(x[start:] + remainders[:-1]) != x_rounded[start:]
+        )
+        if len(mismatches) == 0:
+            assert np.abs(remainders[-1]) < 1e-8
+            return x_rounded
+
+        # Rounding differently at idx changes the remainder passed on to idx + 1.
+        idx = start + mismatches[0]
+        remainder = remainders[mismatches[0]]
+        delta = np.round(x[idx] + remainder) - x_rounded[idx]
+        x_rounded[idx] += delta
+        if idx + 1 < len(x):
+            x_rounded[idx + 1] -= delta
+        remainder += x[idx] - x_rounded[idx]
+        start = idx + 1
 
-    for idx in range(len(x)):
+    for idx in range(start, len(x)):
         x_rounded[idx] = np.round(x[idx] + remainder)
         remainder += x[idx] - x_rounded[idx]
 
     assert np.abs(remainder) < 1e-8
 
     return x_rounded
+
+
+def _simulate_dataset(dataset, seed=0, **kwargs):
+    return simulate_from_data(load_labeled(dataset), seed=seed, **kwargs)
+
+
+def _dataset_size(dataset, segment_sizes=None, **kwargs):
+    if segment_sizes is not None:
+        return sum(segment_sizes)
+    return len(load_labeled(dataset))
+
+
+def _n_observations(n_observations=None, **kwargs):
+    return n_observations
+
+
+def _dirichlet_size(n_observations=None, **kwargs):
+    return 1000 if n_observations is None else n_observations
+
+
+for _dataset in DATASETS + ["dirichlet", "change_in_mean", "change_in_covariance"]:
+    register_scenario(
+        f"{_dataset}-no-change",
+        partial(simulate_no_change, f"{_dataset}-no-change"),
+        parameters={"class_label": "class"},
+        normalize=True,
+        datasets=[_dataset] if _dataset in DATASETS else None,
+    )
+
+for _dataset in DATASETS:
+    register_scenario(
+        _dataset,
+        partial(_simulate_dataset, _dataset),
+        parameters={
+            "class_label": "class",
+            "segment_sizes": None,
+            "minimal_relative_segment_length": 0.01,
+        },
+        normalize=True,
+        cost=partial(_dataset_size, _dataset),
+        datasets=[_dataset],
+    )
+    register_scenario(
+        f"{_dataset}-noise",
+        partial(simulate_with_noise, f"{_dataset}-noise"),
+        parameters={
+            "class_label": "class",
+            "signal_to_noise": 1,
+            "n_observations": 10000,
+            "n_segments": 100,
+            "minimal_relative_segment_length": None,
+        },
+        blocks=partial(_with_noise_blocks, f"{_dataset}-noise"),
+        cost=_n_observations,
+        datasets=[_dataset],
+    )
+
+for _dataset, _simulate_repeated in [
+    ("covertype", simulate_repeated_covertype),
+    ("dry-beans", simulate_repeated_dry_beans),
+    ("wine", simulate_repeated_wine),
+]:
+    register_scenario(
+        f"repeated-{_dataset}",
+        _simulate_repeated,
+        normalize=True,
+        datasets=[_dataset],
+    )
+
+del _dataset, _simulate_repeated
+
+register_scenario(
+    "dirichlet",
+    simulate_dirichlet,
+    parameters={
+        "n_segments": None,
+        "n_observations": None,
+        "minimal_relative_segment_length": None,
+    },
+    blocks=_dirichlet_blocks,
+    cost=_dirichlet_size,
+)
+register_scenario("change_in_mean", simulate_change_in_mean)
+register_scenario(
+    "change_in_covariance", partial(simulate_change_in_covariance, version="old")
+)
+register_scenario(
+    "change_in_covariance_new", partial(simulate_change_in_covariance, version="new")
+)
@@ -0,0 +1,162 @@
+import logging
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from changeforest_simulations._benchmark import benchmark_many
+from changeforest_simulations._results import _is_ok
+from changeforest_simulations._runner import _initialize_worker
+from changeforest_simulations.methods import _r_pool
+
+logger = logging.getLogger(__file__)
+
+
+def verify_results(
+    file_paths,
+    fraction=None,
+    n_per_method=None,
+    random_state=0,
+    n_jobs=1,
+    cache=None,
+    timeout=None,
+    max_memory=None,
+    atol=0,
+    time_ratio=1.5,
+    min_time=0.1,
+    r_pool=False,
+):
+    """Re-run a sample of stored results and compare against the stored ones.
+
+    Results of runs that finished within limits are sampled per method, either a
+    fraction or a fixed number of them. These are re-run, possibly in parallel, and
+    the estimated change points are compared numerically.
+
+    Parameters
+    ----------
+    file_paths : iterable of str or pathlib.Path
+        Csv files written by `benchmark`.
+    fraction : float, optional, default=None
+        Fraction of results to sample per method. Exactly one of fraction and
+        n_per_method must be given.
+    n_per_method : int, optional, default=None
+        Number of results to sample per method. All if there are fewer.
+    random_state : int, optional, default=0
+        Seed for sampling.
+    n_jobs : int, optional, default=1
+        Number of worker processes.
+    cache : changeforest_simulations.SimulationCache, optional, default=None
+        Cache for simulated time series. See `simulate`.
+    timeout : float, optional, default=None
+        Time limit in seconds for each method. See `benchmark`.
+    max_memory : int, optional, default=None
+        Memory limit in bytes for each method. See `benchmark`.
+    atol : float, optional, default=0
+        Estimates match if they have the same number of change points and no change
+        point differs by more than atol.
+    time_ratio : float, optional, default=1.5
+        Flag a timing regression if the new time exceeds the recorded one by more than
+        this factor.
+    min_time : float, optional, default=0.1
+        Do not flag timing regressions if the new time is below min_time seconds.
+        These are dominated by noise.
+    r_pool : bool, optional, default=False
+        Whether to run methods in `R_METHODS` on warm R workers. See `run_tasks`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per verified result with the stored and new estimate, whether they
+        match, the maximal absolute difference of change points (NaN if their number
+        differs), the stored and new time, their ratio and whether the ratio is
+        flagged as a timing regression. `matches` is missing if the re-run exceeded
+        limits.
+    """
+    if (fraction is None) == (n_per_method is None):
+        raise ValueError("Exactly one of fraction and n_per_method must be given.")
+
+    df = pd.concat(
+        [
+            pd.read_csv(file_path).assign(file_path=str(file_path))
+            for file_path in file_paths
+        ]
+    )
+    df = df[[_is_ok(row) for row in df.to_dict("records")]]
+
+    if fraction is not None:
+        df = df.groupby("method").sample(frac=fraction, random_state=random_state)
+    else:
+        df = df.groupby("method", group_keys=False).apply(
+            lambda x: x.sample(min(n_per_method, len(x)), random_state=random_state)
+        )
+
+    groups = df.groupby(["dataset", "seed"])["method"].unique()
+    logger.info(f"Verifying {len(df)} results for {len(groups)} time series.")
+
+    kwargs = {"cache": cache, "timeout": timeout, "max_memory": max_memory}
+    args = [
+        (list(methods), dataset, seed) for (dataset, seed), methods in groups.items()
+    ]
+
+    if n_jobs == 1:
+        if r_pool and not _r_pool.is_running():
+            pool = _r_pool.r_pool()
+        else:
+            pool = nullcontext()
+        with pool:
+            results = [benchmark_many(*arg, **kwargs) for arg in args]
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            n_jobs,
+            mp_context=context,
+            initializer=_initialize_worker,
+            initargs=(logging.getLogger().level, (), r_pool),
+        ) as executor:
+            futures = [executor.submit(benchmark_many, *arg, **kwargs) for arg in args]
+            results = [future.result() for future in futures]
+
+    new = {
+        (result["dataset"], result["seed"], result["method"]): result
+        for group in results
+        for result in group
+    }
+
+    report = []
+    for row in df.to_dict("records"):
+        result = new[(row["dataset"], row["seed"], row["method"])]
+        entry = {
+            "file_path": row["file_path"],
+            "dataset": row["dataset"],
+            "seed": row["seed"],
+            "method": row["method"],
+            "estimated_changepoints": row["estimated_changepoints"],
+            "new_estimated_changepoints": None,
+            "matches": None,
+            "max_abs_diff": np.nan,
+            "time": row["time"],
+            "new_time": result["time"],
+        }
+        if _is_ok(result):
+            expected = _parse_changepoints(row["estimated_changepoints"])
+            actual = np.asarray(result["estimated_changepoints"], dtype=float)
+            if len(expected) == len(actual):
+                entry["max_abs_diff"] = np.max(np.abs(expected - actual), initial=0)
+            entry["new_estimated_changepoints"] = str(list(actual.astype(int)))
+            entry["matches"] = entry["max_abs_diff"] <= atol
+        report.append(entry)
+
+    report = pd.DataFrame(report)
+    report["time_ratio"] = report["new_time"] / report["time"]
+    report["slower"] = report["time_ratio"].gt(time_ratio) & report["new_time"].ge(
+        min_time
+    )
+    return report
+
+
+def _parse_changepoints(string):
+    """Parse stored change points, e.g., "[0, 50, 150]" or "[np.int64(0), ...]"."""
+    return np.array(re.findall(r"(?<![\w.])-?\d+(?:\.\d*)?", string), dtype=float)
@@ -1,3 +1,4 @@
-from ._estimate_changepoints import estimate_changepoints
+from ._estimate_changepoints import FLOAT32_METHODS, R_METHODS, estimate_changepoints
+from ._r_pool import r_pool
 
-__all__ = ["estimate_changepoints"]
+__all__ = ["estimate_changepoints", "FLOAT32_METHODS", "r_pool", "R_METHODS"]
@@ -18,6 +18,15 @@ from .mnwbs_changepoints import mnwbs_changepoints
 from .multirank.dynkw import autoDynKWRupt
 from .ruptures import kernseg_cosine, kernseg_linear, kernseg_rbf
 
+# Methods that run on single precision time series without converting them. Others get
+# a double precision copy. These include the ruptures kernseg variants, which convert
+# to double precision internally, changeforest, which rejects single precision, and
+# methods implemented in R.
+FLOAT32_METHODS = {"multirank"}
+
+# Methods implemented in R. These can be run on warm R workers, see `r_pool`.
+R_METHODS = {"ecp", "decon", "r_kernseg", "mnwbs", "mnwbs_changepoints"}
+
 
 def estimate_changepoints(X, method, minimal_relative_segment_length, **kwargs):
 
@@ -26,6 +35,9 @@ def estimate_changepoints(X, method, minimal_relative_segment_length, **kwargs):
     method, additional_kwargs = string_to_kwargs(method)
     kwargs = {**kwargs, **additional_kwargs}
 
+    if X.dtype != np.float64 and method not in FLOAT32_METHODS:
+        X = X.astype(np.float64)
+
     if method == "ecp":
         return ecp(
             X, minimal_relative_segment_length=minimal_relative_segment_length, **kwargs
@@ -1,8 +1,14 @@
 from rpy2.robjects import default_converter, numpy2ri, r
 from rpy2.robjects.conversion import localconverter
 
+from ._r_pool import call
+
 
 def kernseg(X, minimal_relative_segment_length):
+    return call(_kernseg, X, minimal_relative_segment_length)
+
+
+def _kernseg(X, minimal_relative_segment_length):
     D_max = int(1 / minimal_relative_segment_length)
     n, p = X.shape
 
@@ -0,0 +1,201 @@
+import multiprocessing
+import os
+import queue
+from contextlib import contextmanager
+from pathlib import Path
+
+from changeforest_simulations._limits import _receive, _send
+
+# R packages used by the R methods. They are loaded by `preload`.
+_PACKAGES = ["ecp", "kcpRS", "KernSeg", "Rfast", "changepoints"]
+_MNWBS_SCRIPT_PATH = Path(__file__).parent / "mnwbs" / "utils2.R"
+
+_pool = None
+_pool_pid = None
+_sourced = set()
+
+
+@contextmanager
+def r_pool(n_workers=1):
+    """Run R methods on a pool of long-lived R worker processes.
+
+    Within the context, `ecp`, `decon`, `r_kernseg`, `mnwbs` and `mnwbs_changepoints`
+    send the time series to one of `n_workers` worker processes, each with its own
+    embedded R that has all required R packages and scripts loaded at start-up. R
+    methods called from several threads thus run concurrently instead of one after the
+    other on the embedded R of the calling process, which is not thread safe.
+
+    `benchmark` runs the estimation of methods in `R_METHODS` on the pool, including
+    profiling. Workers exceeding its `timeout` or `max_memory` are killed and replaced.
+
+    Parameters
+    ----------
+    n_workers : int, optional, default=1
+        Number of R worker processes.
+    """
+    if is_running():
+        raise RuntimeError("An R pool is already running.")
+
+    start(n_workers)
+    try:
+        yield
+    finally:
+        stop()
+
+
+def start(n_workers=1):
+    """Start the R pool of this process. See `r_pool`.
+
+    Workers are daemonic. If `stop` is not called, they are terminated when this
+    process exits.
+    """
+    global _pool, _pool_pid
+
+    _pool = _Pool(n_workers)
+    _pool_pid = os.getpid()
+
+
+def stop():
+    """Stop the R pool of this process."""
+    global _pool, _pool_pid
+
+    if is_running():
+        _pool.shutdown()
+    _pool, _pool_pid = None, None
+
+
+def is_running():
+    """Whether the R pool is running in this process.
+
+    The pool is not used in processes forked from the one that started it, e.g., for
+    `benchmark(..., timeout=...)`.
+    """
+    return _pool is not None and _pool_pid == os.getpid()
+
+
+def preload():
+    """Load R packages and scripts used by the R methods into the embedded R."""
+    from rpy2.robjects import r
+
+    packages = ", ".join(f"'{package}'" for package in _PACKAGES)
+    # Packages that are not installed are skipped. Methods using them fail when called.
+    r(f"for (package in c({packages})) requireNamespace(package, quietly=TRUE)")
+    source(_MNWBS_SCRIPT_PATH)
+
+
+def source(path):
+    """Source the R script at path into the embedded R unless already done."""
+    from rpy2.robjects import r
+
+    if path not in _sourced:
+        r.source(str(path))
+        _sourced.add(path)
+
+
+def run(func, *args, timeout=None, max_memory=None, **kwargs):
+    """Call func on the R pool within limits.
+
+    Returns a status, which is one of "ok", "error", "timeout" and "oom", and the result
+    of func, the traceback if func raised or None (see `_receive`).
+    """
+    if not is_running():
+        raise RuntimeError("The R pool is not running.")
+    return _pool.run(func, args, kwargs, timeout, max_memory)
+
+
+def call(func, *args, **kwargs):
+    """Call func on the R pool if running, else in the calling process."""
+    if not is_running():
+        return func(*args, **kwargs)
+
+    status, result = run(func, *args, **kwargs)
+    if status == "error":
+        raise RuntimeError(f"{func.__name__} failed on the R pool:\n{result}")
+    if status == "oom":
+        raise MemoryError(f"{func.__name__} ran out of memory on the R pool.")
+    return result
+
+
+class _Pool:
+    def __init__(self, n_workers):
+        self._idle = queue.SimpleQueue()
+        for _ in range(n_workers):
+            self._idle.put(_Worker())
+        self._n_workers = n_workers
+
+    def run(self, func, args, kwargs, timeout, max_memory):
+        worker = self._idle.get()
+        try:
+            status, result = worker.run(func, args, kwargs, timeout, max_memory)
+        except BaseException:
+            # The worker died or is still busy, e.g., after a KeyboardInterrupt.
+            worker.kill()
+            self._idle.put(_Worker())
+            raise
+
+        if status in ["ok", "error"]:
+            self._idle.put(worker)
+        else:
+            worker.kill()
+            self._idle.put(_Worker())
+        return status, result
+
+    def shutdown(self):
+        for _ in range(self._n_workers):
+            self._idle.get().stop()
+
+
+class _Worker:
+    """Process with an embedded R that runs functions sent to it."""
+
+    def __init__(self):
+        context = multiprocessing.get_context("spawn")
+        self._connection, connection = context.Pipe()
+        self._process = context.Process(target=_serve, args=(connection,), daemon=True)
+        self._process.start()
+        connection.close()
+        self._started = False
+
+    def run(self, func, args, kwargs, timeout, max_memory):
+        if not self._started:
+            # Loading R does not count towards the limits of the first call.
+            status, result = _receive(self._connection, self._process, "R worker")
+            if status != "ok":
+                raise RuntimeError(f"Could not start R worker:\n{result}")
+            self._started = True
+
+        self._connection.send((func, args, kwargs))
+        return _receive(
+            self._connection,
+            self._process,
+            f"{func.__name__} on the R pool",
+            timeout,
+            max_memory,
+        )
+
+    def kill(self):
+        self._process.kill()
+        self._process.join()
+        self._connection.close()
+
+    def stop(self):
+        try:
+            self._connection.send(None)
+        except OSError:
+            pass
+        self._process.join(timeout=10)
+        self.kill()
+
+
+def _serve(connection):
+    _send(connection, preload)
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+
+        func, args, kwargs = message
+        _send(connection, func, *args, **kwargs)
@@ -2,8 +2,14 @@ import numpy as np
 from rpy2.robjects import default_converter, numpy2ri, r
 from rpy2.robjects.conversion import localconverter
 
+from ._r_pool import call
+
 
 def decon(X, minimal_relative_segment_length):
+    return call(_decon, X, minimal_relative_segment_length)
+
+
+def _decon(X, minimal_relative_segment_length):
     n, p = X.shape
 
     wsize = max(25, int(2 * np.ceil(minimal_relative_segment_length * n)))
@@ -1,8 +1,14 @@
 from rpy2.robjects import default_converter, numpy2ri, r
 from rpy2.robjects.conversion import localconverter
 
+from ._r_pool import call
+
 
 def ecp(X, minimal_relative_segment_length):
+    return call(_ecp, X, minimal_relative_segment_length)
+
+
+def _ecp(X, minimal_relative_segment_length):
     min_size = int(max(minimal_relative_segment_length * X.shape[0], 2))
 
     n, p = X.shape
@@ -5,14 +5,20 @@ from changeforest import changeforest
 from rpy2.robjects import default_converter, numpy2ri, r
 from rpy2.robjects.conversion import localconverter
 
+from .._r_pool import call, source
+
 _SCRIPT_PATH = Path(__file__).parent / "utils2.R"
 
 
 def mnwbs(X, minimal_relative_segment_length, **kwargs):
+    return call(_mnwbs, X, minimal_relative_segment_length, **kwargs)
+
+
+def _mnwbs(X, minimal_relative_segment_length, **kwargs):
 
     n, p = X.shape
 
-    r.source(str(_SCRIPT_PATH))
+    source(_SCRIPT_PATH)
 
     segments = changeforest(X, "change_in_mean", "wbs").segments[0:50]
     alpha = np.array([s.start for s in segments])
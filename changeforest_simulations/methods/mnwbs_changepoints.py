@@ -3,8 +3,14 @@ from rpy2.rinterface_lib.sexp import NULLType
 from rpy2.robjects import default_converter, numpy2ri, r
 from rpy2.robjects.conversion import localconverter
 
+from ._r_pool import call
+
 
 def mnwbs_changepoints(X, minimal_relative_segment_length):
+    return call(_mnwbs_changepoints, X, minimal_relative_segment_length)
+
+
+def _mnwbs_changepoints(X, minimal_relative_segment_length):
     n, p = X.shape
 
     # Same as https://arxiv.org/pdf/1910.13289.pdf, page 12, except for replacing 30
@@ -0,0 +1,22 @@
+# Download datasets before running simulations, e.g., once per cluster. Call this
+# script with, e.g.,
+# `python -m changeforest_simulations.prefetch --base-url /shared/mirror/datasets`
+import logging
+
+import click
+
+from changeforest_simulations._prefetch import prefetch_datasets
+
+
+@click.command()
+@click.argument("datasets", nargs=-1)
+@click.option("--base-url", default=None, help="Mirror directory or URL.")
+@click.option("--n-jobs", default=8, help="Number of concurrent downloads.")
+def main(datasets, base_url, n_jobs):
+    logging.basicConfig(level=logging.INFO)
+    fetched = prefetch_datasets(datasets or None, base_url=base_url, n_jobs=n_jobs)
+    print(f"Fetched {len(fetched)} files.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,63 @@
 import numpy as np
 from scipy.spatial.distance import cdist
-from sklearn.metrics import adjusted_rand_score as sklearn_adjusted_rand_score
 
 
 def adjusted_rand_score(true_changepoints, estimated_changepoints):
     """Compute the adjusted rand index between two sets of changepoints.
 
-    Uses sklearn.metrics.adjusted_rand_score under the hood. See their documentation:
+    Equal to `sklearn.metrics.adjusted_rand_score` of the segment labels, see
     https://scikit-learn.org/stable/modules/generated/sklearn.metrics.adjusted_rand_score.html
+    The contingency table of two segmentations consists of the lengths of the
+    intersections of their segments. These are computed from the merged change points
+    in `O((k + m) log(k + m))` for `k` and `m` change points, independent of `n`.
 
     Examples
     --------
     >>> adjusted_rand_score([0, 50, 100, 150], [0, 100, 150])
     0.5681159420289855
     """
-    true_changepoints = np.array(true_changepoints, dtype=np.int_)
-    estimated_changepoints = np.array(estimated_changepoints, dtype=np.int_)
-
-    y_true = np.zeros(true_changepoints[-1])
-    for i, (start, stop) in enumerate(
-        zip(true_changepoints[:-1], true_changepoints[1:])
-    ):
-        y_true[start:stop] = i
-
-    y_estimated = np.zeros(estimated_changepoints[-1])
-    for i, (start, stop) in enumerate(
-        zip(estimated_changepoints[:-1], estimated_changepoints[1:])
-    ):
-        y_estimated[start:stop] = i
-
-    return sklearn_adjusted_rand_score(y_true, y_estimated)
+    true_boundaries = _segment_boundaries(true_changepoints)
+    estimated_boundaries = _segment_boundaries(estimated_changepoints)
+
+    n = int(true_boundaries[-1])
+    if n != estimated_boundaries[-1]:
+        raise ValueError(
+            "Change points must end at the same n. Got "
+            f"{n} and {estimated_boundaries[-1]}."
+        )
+
+    # Pair confusion matrix as in sklearn.metrics.cluster.pair_confusion_matrix, with
+    # the sums of squares of the contingency table, its row sums and column sums.
+    sum_squares = _sum_of_squares(
+        np.diff(np.union1d(true_boundaries, estimated_boundaries))
+    )
+    true_sum_squares = _sum_of_squares(np.diff(true_boundaries))
+    estimated_sum_squares = _sum_of_squares(np.diff(estimated_boundaries))
+
+    tp = sum_squares - n
+    fp = estimated_sum_squares - sum_squares
+    fn = true_sum_squares - sum_squares
+    tn = n**2 - fp - fn - sum_squares
+
+    if fn == 0 and fp == 0:
+        return 1.0
+
+    return 2.0 * (tp * tn - fn * fp) / ((tp + fn) * (fn + tn) + (tp + fp) * (fp + tn))
+
+
+def _segment_boundaries(changepoints):
+    """Start and stop of segments, including 0 and `changepoints[-1]`.
+
+    Observations before `changepoints[0]` belong to the first segment.
+    """
+    changepoints = np.array(changepoints, dtype=np.int_)
+    n = changepoints[-1]
+    return np.sort(np.concatenate([[0], np.clip(changepoints[1:-1], 0, n), [n]]))
+
+
+def _sum_of_squares(lengths):
+    # Python integers to avoid overflow.
+    return sum(int(length) ** 2 for length in lengths)
 
 
 def hausdorff_distance(true_changepoints, estimated_changepoints):
@@ -1,6 +1,20 @@
+import sys
+from functools import lru_cache
+
+
 def string_to_kwargs(string):
+    """Split a string `name__key=value__...` into name and dict of kwargs.
+
+    Parsed strings are cached. A new dict is returned for each call.
+    """
+    name, kwargs = _string_to_kwargs(string)
+    return name, dict(kwargs)
+
+
+@lru_cache(maxsize=2**14)
+def _string_to_kwargs(string):
     if "__" not in string:
-        return string, {}
+        return sys.intern(string), ()
 
     first_value, list_of_args = string.split("__", 1)
 
@@ -19,6 +33,6 @@ def string_to_kwargs(string):
         if v == "None":
             v = None
 
-        kwargs[k] = v
+        kwargs[sys.intern(k)] = v
 
-    return first_value, kwargs
+    return sys.intern(first_value), tuple(kwargs.items())
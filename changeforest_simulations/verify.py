@@ -0,0 +1,90 @@
+# Re-run a sample of stored results and compare them against the stored ones.
+# Call this script with, e.g.,
+# `python -m changeforest_simulations.verify output/main/changeforest_*.csv --fraction 0.01 --n-jobs 64`
+import logging
+
+import click
+
+from changeforest_simulations._cache import SimulationCache
+from changeforest_simulations._verify import verify_results
+
+logger = logging.getLogger(__file__)
+
+
+@click.command()
+@click.argument("files", nargs=-1, required=True)
+@click.option("--fraction", default=None, type=float, help="Fraction per method.")
+@click.option("--n-per-method", default=None, type=int, help="Number per method.")
+@click.option("--random-state", default=0, help="Seed for sampling.")
+@click.option("--n-jobs", default=1, help="Number of worker processes.")
+@click.option("--cache-dir", default=None, help="Cache simulated time series here.")
+@click.option("--timeout", default=None, type=float, help="Time limit in seconds.")
+@click.option("--max-memory", default=None, type=float, help="Memory limit in GB.")
+@click.option("--atol", default=0.0, help="Tolerance for change point differences.")
+@click.option("--time-ratio", default=1.5, help="Flag runs slower by this factor.")
+@click.option("--report", default="verify_report.csv", help="Write report here.")
+@click.option("--r-pool", is_flag=True, help="Run R methods on warm R workers.")
+def main(
+    files,
+    fraction,
+    n_per_method,
+    random_state,
+    n_jobs,
+    cache_dir,
+    timeout,
+    max_memory,
+    atol,
+    time_ratio,
+    report,
+    r_pool,
+):
+    logging.basicConfig(level=logging.INFO)
+
+    cache = SimulationCache(cache_dir) if cache_dir is not None else None
+
+    if max_memory is not None:
+        max_memory = int(max_memory * 1e9)
+
+    df = verify_results(
+        files,
+        fraction=fraction,
+        n_per_method=n_per_method,
+        random_state=random_state,
+        n_jobs=n_jobs,
+        cache=cache,
+        timeout=timeout,
+        max_memory=max_memory,
+        atol=atol,
+        time_ratio=time_ratio,
+        r_pool=r_pool,
+    )
+    df.to_csv(report, index=False)
+    logger.info(f"Wrote report to {report}.")
+
+    mismatches = df[lambda x: x["matches"].eq(False)]
+    not_verified = df[lambda x: x["matches"].isna()]
+    slower = df[lambda x: x["slower"]]
+
+    print(f"\nVerified {len(df)} results.")
+    print(f"{len(mismatches)} estimates differ from the stored ones.")
+    print(f"{len(not_verified)} runs exceeded limits.")
+    print(f"{len(slower)} runs were slower by more than a factor of {time_ratio}.")
+
+    if len(slower) > 0:
+        print("\nTiming regressions (median ratio of new to recorded time):\n")
+        print(
+            slower.groupby("method")["time_ratio"].agg(["median", "count"]).to_string()
+        )
+
+    if len(mismatches) > 0:
+        print("\nDiffering estimates:\n")
+        print(
+            mismatches[
+                ["file_path", "dataset", "seed", "method", "max_abs_diff"]
+            ].to_string(index=False)
+        )
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
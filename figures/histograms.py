@@ -30,6 +30,8 @@ def main(file, dataset):
     alpha, _ = simulate(dataset)
 
     df = pd.concat([pd.read_csv(f) for f in _OUTPUT_PATH.glob(f"{file}_*.csv")], axis=0)
+    # Drop runs that exceeded time or memory limits.
+    df = df[lambda x: x["estimated_changepoints"].notna()]
     df["method"] = df["method"].replace(METHOD_RENAMING)
 
     df = df[lambda x: x["dataset"].eq(dataset)]
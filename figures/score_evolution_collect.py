@@ -5,8 +5,16 @@ import logging
 from pathlib import Path
 
 import click
+import numpy as np
 
-from changeforest_simulations import HEADER, benchmark
+from changeforest_simulations import (
+    HEADERS,
+    CostModel,
+    SimulationCache,
+    Task,
+    TaskQueue,
+    run_tasks,
+)
 
 _OUTPUT_FOLDER = Path(__file__).parents[1].absolute() / "output" / "score_evolution"
 logger = logging.getLogger(__file__)
@@ -17,7 +25,39 @@ logger = logging.getLogger(__file__)
 @click.option("--seed-start", default=0, help="Seed from which to start iteration.")
 @click.option("--file", default=None, help="Filename to use.")
 @click.option("--append", is_flag=True, help="Don't raise if csv already exists.")
-def main(n_seeds, seed_start, file, append):
+@click.option("--n-jobs", default=1, help="Number of worker processes.")
+@click.option("--cache-dir", default=None, help="Cache simulated time series here.")
+@click.option("--profile", is_flag=True, help="Record stage timings and peak memory.")
+@click.option(
+    "--timeout", default=None, type=float, help="Time limit per run in seconds."
+)
+@click.option("--max-memory", default=None, type=float, help="Memory limit in GB.")
+@click.option("--queue-dir", default=None, help="Claim tasks via this shared dir.")
+@click.option(
+    "--shared-memory", is_flag=True, help="Share datasets between worker processes."
+)
+@click.option(
+    "--dtype",
+    default="float64",
+    type=click.Choice(["float64", "float32"]),
+    help="Simulate time series in this precision. Use a separate --file.",
+)
+@click.option("--r-pool", is_flag=True, help="Run R methods on warm R workers.")
+def main(
+    n_seeds,
+    seed_start,
+    file,
+    append,
+    n_jobs,
+    cache_dir,
+    profile,
+    timeout,
+    max_memory,
+    queue_dir,
+    shared_memory,
+    dtype,
+    r_pool,
+):
     _OUTPUT_FOLDER.mkdir(exist_ok=True)
 
     method_list = [
@@ -57,15 +97,26 @@ def main(n_seeds, seed_start, file, append):
         "dry-beans-noise",
     ]
 
+    cache = SimulationCache(cache_dir) if cache_dir is not None else None
+    queue = TaskQueue(queue_dir) if queue_dir is not None else None
+    # Timings of earlier runs, e.g., for other seeds, to run long tasks first.
+    cost_model = CostModel.from_files(_OUTPUT_FOLDER.glob("*.csv"))
+
+    if max_memory is not None:
+        max_memory = int(max_memory * 1e9)
+
+    tasks = []
     for seed in range(seed_start, seed_start + n_seeds):
 
         logging.basicConfig(level=logging.INFO)
         file_path = _OUTPUT_FOLDER / f"{file}_{seed}.csv"
-        if file_path.exists():
-            if not append:
+        try:
+            # Several nodes might create the file at the same time.
+            with open(file_path, "x") as f:
+                f.write(HEADERS[3])
+        except FileExistsError:
+            if not append and queue is None:
                 raise ValueError(f"File {file_path} already exists.")
-        else:
-            file_path.write_text(HEADER)
         logger.info(f"Writing results to {file_path}.")
 
         for dataset in dataset_list:
@@ -73,21 +124,21 @@ def main(n_seeds, seed_start, file, append):
                 for n_observations in n_observations_list:
                     dataset_name = f"{dataset}__n_segments={n_segments}__n_observations={n_observations}"
                     for method in method_list:
-                        if method == "ecp" and n_observations >= 10000:
-                            continue
-                        if method == "multirank" and n_observations > 16000:
-                            continue
-                        if method == "changekNN_bs" and n_observations > 32000:
-                            continue
-                        if method == "kernseg_rbf" and n_observations >= 64000:
-                            continue
-                        if method == "mnwbs_changepoints":
-                            if dataset == "dry-beans-noise" and n_observations >= 500:
-                                continue
-                            if dataset == "dirichlet" and n_observations >= 1000:
-                                continue
+                        tasks.append(Task(method, dataset_name, seed, file_path))
 
-                        benchmark(method, dataset_name, seed, file_path=file_path)
+    run_tasks(
+        tasks,
+        n_jobs=n_jobs,
+        cache=cache,
+        profile=profile,
+        timeout=timeout,
+        max_memory=max_memory,
+        cost_model=cost_model,
+        queue=queue,
+        shared_memory=shared_memory,
+        dtype=np.dtype(dtype),
+        r_pool=r_pool,
+    )
 
 
 if __name__ == "__main__":
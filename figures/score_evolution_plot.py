@@ -27,6 +27,17 @@ plt.rcParams.update({"font.size": FIGURE_FONT_SIZE})
 @click.option("--file", default=None)
 def main(file):
     df = pd.concat([pd.read_csv(f) for f in _OUTPUT_PATH.glob(f"{file}_*.csv")], axis=0)
+    # Runs that exceeded time or memory limits have no estimate. Averaging over the
+    # remaining runs would favor methods on easier seeds. Instead, drop methods on
+    # datasets with such runs.
+    incomplete = df.loc[
+        lambda x: x["estimated_changepoints"].isna(), ["method", "dataset"]
+    ]
+    df = df[
+        lambda x: ~pd.MultiIndex.from_frame(x[["method", "dataset"]]).isin(
+            pd.MultiIndex.from_frame(incomplete)
+        )
+    ]
 
     df["n_segments"] = (
         df["dataset"]
@@ -18,8 +18,21 @@ _OUTPUT_PATH = Path(__file__).parents[1].absolute() / "output" / "false_positive
 @click.option("--latex", is_flag=True, help="Output in LaTeX format.")
 def main(file, latex):
     df = pd.concat([pd.read_csv(f) for f in _OUTPUT_PATH.glob(f"{file}_*.csv")])
-    df["false_positive"] = df["n_cpts"] > 0
-    df_grouped = df.groupby(["dataset", "method"])["false_positive"].mean() * 100
+    # Runs that exceeded time or memory limits have no estimate. Averaging over the
+    # remaining runs would favor methods on easier seeds. Instead, mark methods as
+    # incomplete on datasets with such runs.
+    exceeded = df["estimated_changepoints"].isna()
+    incomplete = df.loc[exceeded, ["method", "dataset"]].drop_duplicates()
+    df = df[~exceeded]
+    df_complete = df[
+        lambda x: ~pd.MultiIndex.from_frame(x[["method", "dataset"]]).isin(
+            pd.MultiIndex.from_frame(incomplete)
+        )
+    ].assign(false_positive=lambda x: x["n_cpts"] > 0)
+
+    df_grouped = (
+        df_complete.groupby(["dataset", "method"])["false_positive"].mean() * 100
+    )
     df_display = (
         df_grouped.apply(lambda x: f"{x:.2f}")
         .reset_index()
@@ -28,6 +41,9 @@ def main(file, latex):
     df_display[("false_positive", "worst-no-change")] = (
         df_grouped.groupby("method").max().apply(lambda x: f"{x:.2f}")
     )
+    for method, dataset in incomplete.itertuples(index=False):
+        for key in [dataset, "worst-no-change"]:
+            df_display.loc[method, ("false_positive", key)] = "incomplete"
     to_latex(df_display, latex=latex)
 
     to_latex(
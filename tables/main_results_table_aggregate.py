@@ -20,6 +20,23 @@ _OUTPUT_PATH = Path(__file__).parents[1].absolute() / "output" / "main"
 @click.option("--latex", is_flag=True, help="Output in LaTeX format.")
 def main(file, latex):
     df = pd.concat([pd.read_csv(f) for f in _OUTPUT_PATH.glob(f"{file}_*.csv")])
+    # Runs that exceeded time or memory limits have no estimate. Averaging over the
+    # remaining runs would favor methods on easier seeds. Instead, mark methods as
+    # incomplete on datasets with such runs.
+    exceeded = df["estimated_changepoints"].isna()
+    incomplete = df.loc[exceeded, ["method", "dataset"]].drop_duplicates()
+    df_n = (
+        df[~exceeded]
+        .groupby(["method", "dataset"])
+        .size()
+        .reset_index()
+        .pivot(index=["method"], columns=["dataset"])
+    )
+    df = df[
+        lambda x: ~pd.MultiIndex.from_frame(x[["method", "dataset"]]).isin(
+            pd.MultiIndex.from_frame(incomplete)
+        )
+    ]
 
     # ARI
     df_score = df.groupby(["method", "dataset"])["score"].apply(
@@ -39,6 +56,7 @@ def main(file, latex):
 
     df_worst = df.groupby(["method", "dataset"])["score"].mean().groupby("method").min()
     df_score[("score", "worst")] = df_worst.apply(lambda x: f"{x:.2f}")
+    mark_incomplete(df_score, incomplete, aggregates=["average", "worst"])
 
     print("\n\nMean adjusted Rand indices (Table 2):\n")
     to_latex(df_score, latex=latex, split=True)
@@ -46,6 +64,7 @@ def main(file, latex):
     # time
     df_time = df.groupby(["method", "dataset"])["time"].apply(lambda x: fmt(np.mean(x)))
     df_time = df_time.reset_index().pivot(index=["method"], columns=["dataset"])
+    mark_incomplete(df_time, incomplete)
     print("\n\nMean computational times (Table 3):\n")
     to_latex(df_time, latex=latex)
 
@@ -54,6 +73,7 @@ def main(file, latex):
         lambda x: f"{np.mean(x):.2f} {np.std(x):.2f}"
     )
     df_n_cpts = df_n_cpts.reset_index().pivot(index=["method"], columns=["dataset"])
+    mark_incomplete(df_n_cpts, incomplete)
     print("\n\nMean number of changepoints estimated (Table 5):\n")
     to_latex(df_n_cpts, latex=latex, split=True)
 
@@ -72,19 +92,22 @@ def main(file, latex):
         .mean()
     )
     df_score[("symmetric_hausdorff", "average")] = df_mean.apply(lambda x: f"{x:.1f}")
+    mark_incomplete(df_score, incomplete, aggregates=["average"])
     print("\n\nMedian hausdorff distances (Table 6):\n")
     to_latex(df_score, latex=latex, split=True)
 
-    df_n = (
-        df.groupby(["method", "dataset"])
-        .size()
-        .reset_index()
-        .pivot(index=["method"], columns=["dataset"])
-    )
-    print("\n\nN\n")
+    print("\n\nN (runs within limits)\n")
     to_latex(df_n, latex=latex)
 
 
+def mark_incomplete(df, incomplete, aggregates=()):
+    """Mark cells of methods that exceeded limits on some runs of a dataset."""
+    column = df.columns.get_level_values(level=0)[0]
+    for method, dataset in incomplete.itertuples(index=False):
+        for key in [dataset, *aggregates]:
+            df.loc[method, (column, key)] = "incomplete"
+
+
 def fmt(x):
     if np.log10(x) > 1:
         return f"{x:.0f}"
@@ -3,7 +3,14 @@ from pathlib import Path
 
 import click
 
-from changeforest_simulations import HEADER, benchmark
+from changeforest_simulations import (
+    HEADERS,
+    CostModel,
+    SimulationCache,
+    Task,
+    TaskQueue,
+    run_tasks,
+)
 
 _OUTPUT_FOLDER = Path(__file__).parents[1].absolute() / "output" / "main"
 logger = logging.getLogger(__file__)
@@ -17,7 +24,35 @@ logger = logging.getLogger(__file__)
 @click.option("--file", default=None, help="Filename to use.")
 @click.option("--append", is_flag=True, help="Don't raise if csv already exists.")
 @click.option("--verify", is_flag=True)
-def main(n_seeds, seed_start, methods, datasets, file, append, verify):
+@click.option("--n-jobs", default=1, help="Number of worker processes.")
+@click.option("--cache-dir", default=None, help="Cache simulated time series here.")
+@click.option("--profile", is_flag=True, help="Record stage timings and peak memory.")
+@click.option(
+    "--timeout", default=None, type=float, help="Time limit per run in seconds."
+)
+@click.option("--max-memory", default=None, type=float, help="Memory limit in GB.")
+@click.option("--queue-dir", default=None, help="Claim tasks via this shared dir.")
+@click.option(
+    "--shared-memory", is_flag=True, help="Share datasets between worker processes."
+)
+@click.option("--r-pool", is_flag=True, help="Run R methods on warm R workers.")
+def main(
+    n_seeds,
+    seed_start,
+    methods,
+    datasets,
+    file,
+    append,
+    verify,
+    n_jobs,
+    cache_dir,
+    profile,
+    timeout,
+    max_memory,
+    queue_dir,
+    shared_memory,
+    r_pool,
+):
     _OUTPUT_FOLDER.mkdir(exist_ok=True)
 
     logging.basicConfig(level=logging.INFO)
@@ -51,14 +86,25 @@ def main(n_seeds, seed_start, methods, datasets, file, append, verify):
     else:
         methods = methods.split(" ")
 
+    cache = SimulationCache(cache_dir) if cache_dir is not None else None
+    queue = TaskQueue(queue_dir) if queue_dir is not None else None
+    # Timings of earlier runs, e.g., for other seeds, to run long tasks first.
+    cost_model = CostModel.from_files(_OUTPUT_FOLDER.glob("*.csv"))
+
+    if max_memory is not None:
+        max_memory = int(max_memory * 1e9)
+
+    tasks = []
     for seed in range(seed_start, seed_start + n_seeds):
 
         file_path = _OUTPUT_FOLDER / f"{file}_{seed}.csv"
-        if file_path.exists():
-            if not append:
+        try:
+            # Several nodes might create the file at the same time.
+            with open(file_path, "x") as f:
+                f.write(HEADERS[3])
+        except FileExistsError:
+            if not append and queue is None:
                 raise ValueError(f"File {file_path} already exists.")
-        else:
-            file_path.write_text(HEADER)
 
         logger.info(f"Writing results to {file_path}.")
 
@@ -67,15 +113,21 @@ def main(n_seeds, seed_start, methods, datasets, file, append, verify):
                 if method == "multirank" and dataset == "dry-beans":
                     continue  # Singular Matrix error
 
-                # slow
-                if method == "mnwbs_changepoints" and dataset in [
-                    "dry-beans",
-                    "wine",
-                    "abalone",
-                ]:
-                    continue
-
-                benchmark(method, dataset, seed, file_path=file_path, verify=verify)
+                tasks.append(Task(method, dataset, seed, file_path))
+
+    run_tasks(
+        tasks,
+        n_jobs=n_jobs,
+        verify=verify,
+        cache=cache,
+        profile=profile,
+        timeout=timeout,
+        max_memory=max_memory,
+        cost_model=cost_model,
+        queue=queue,
+        shared_memory=shared_memory,
+        r_pool=r_pool,
+    )
 
 
 if __name__ == "__main__":
@@ -3,7 +3,14 @@ from pathlib import Path
 
 import click
 
-from changeforest_simulations import HEADER, benchmark
+from changeforest_simulations import (
+    HEADERS,
+    CostModel,
+    SimulationCache,
+    Task,
+    TaskQueue,
+    run_tasks,
+)
 
 _OUTPUT_FOLDER = Path(__file__).parents[1].absolute() / "output" / "tuning_kcp"
 logger = logging.getLogger(__file__)
@@ -14,7 +21,26 @@ logger = logging.getLogger(__file__)
 @click.option("--n-seeds", default=100, help="Number of seeds to use for simulation.")
 @click.option("--seed-start", default=0, help="Seed from which to start iteration.")
 @click.option("--append", is_flag=True, help="Don't raise if csv already exists.")
-def main(file, n_seeds, seed_start, append):
+@click.option("--n-jobs", default=1, help="Number of worker processes.")
+@click.option("--cache-dir", default=None, help="Cache simulated time series here.")
+@click.option("--profile", is_flag=True, help="Record stage timings and peak memory.")
+@click.option("--queue-dir", default=None, help="Claim tasks via this shared dir.")
+@click.option(
+    "--shared-memory", is_flag=True, help="Share datasets between worker processes."
+)
+@click.option("--r-pool", is_flag=True, help="Run R methods on warm R workers.")
+def main(
+    file,
+    n_seeds,
+    seed_start,
+    append,
+    n_jobs,
+    cache_dir,
+    profile,
+    queue_dir,
+    shared_memory,
+    r_pool,
+):
     _OUTPUT_FOLDER.mkdir(exist_ok=True)
 
     logging.basicConfig(level=logging.INFO)
@@ -31,21 +57,40 @@ def main(file, n_seeds, seed_start, append):
         "dirichlet",
     ]
 
+    cache = SimulationCache(cache_dir) if cache_dir is not None else None
+    queue = TaskQueue(queue_dir) if queue_dir is not None else None
+    # Timings of earlier runs, e.g., for other seeds, to run long tasks first.
+    cost_model = CostModel.from_files(_OUTPUT_FOLDER.glob("*.csv"))
+
+    tasks = []
     for seed in range(seed_start, seed_start + n_seeds):
         file_path = _OUTPUT_FOLDER / f"{file}_{seed}.csv"
-        if file_path.exists():
-            if not append:
+        try:
+            # Several nodes might create the file at the same time.
+            with open(file_path, "x") as f:
+                f.write(HEADERS[3])
+        except FileExistsError:
+            if not append and queue is None:
                 raise ValueError(f"File {file_path} already exists.")
-        else:
-            file_path.write_text(HEADER)
 
         logger.info(f"Writing results to {file_path}.")
+        methods = [
+            f"kernseg_rbf__gamma={gamma}"
+            for gamma in [0.025, 0.05, 0.1, 0.2, 0.4, 0.8, "median"]
+        ] + ["kernseg_linear", "kernseg_cosine"]
         for dataset in datasets:
-            for method in [
-                f"kernseg_rbf__gamma={gamma}"
-                for gamma in [0.025, 0.05, 0.1, 0.2, 0.4, 0.8, "median"]
-            ] + ["kernseg_linear", "kernseg_cosine"]:
-                benchmark(method, dataset, seed, file_path=file_path)
+            tasks += [Task(method, dataset, seed, file_path) for method in methods]
+
+    run_tasks(
+        tasks,
+        n_jobs=n_jobs,
+        cache=cache,
+        profile=profile,
+        cost_model=cost_model,
+        queue=queue,
+        shared_memory=shared_memory,
+        r_pool=r_pool,
+    )
 
 
 if __name__ == "__main__":
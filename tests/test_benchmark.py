@@ -3,7 +3,13 @@ import json
 import pandas as pd
 import pytest
 
-from changeforest_simulations import HEADER, benchmark
+from changeforest_simulations import (
+    HEADER,
+    HEADERS,
+    PROFILING_COLUMNS,
+    benchmark,
+    benchmark_many,
+)
 
 
 @pytest.mark.parametrize("method, dataset", [("change_in_mean_bs", "iris")])
@@ -29,3 +35,73 @@ def test_benchmark(method, dataset, tmp_path):
 
     _ = benchmark(method, dataset, 1, file_path=tmp_path / "benchmark.csv")
     assert len(df) == 1
+
+
+def test_benchmark_many(tmp_path):
+    file_path = tmp_path / "benchmark.csv"
+    file_path.write_text(HEADER)
+
+    methods = ["change_in_mean_bs", "changeforest_bs"]
+    results = benchmark_many(methods, "iris", 0, file_path=file_path)
+    assert [result["method"] for result in results] == methods
+
+    df = pd.read_csv(file_path)
+    assert df["method"].tolist() == methods
+
+    # Only the method that has not been benchmarked yet is run.
+    results = benchmark_many(methods + ["changekNN_bs"], "iris", 0, file_path=file_path)
+    assert [result["method"] for result in results] == ["changekNN_bs"]
+
+    for method in methods:
+        expected = benchmark(method, "iris", 0)
+        assert expected["estimated_changepoints"] == json.loads(
+            df[lambda x: x["method"].eq(method)]["estimated_changepoints"].iloc[0]
+        )
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_benchmark_profile(version, tmp_path):
+    file_path = tmp_path / "benchmark.csv"
+    file_path.write_text(HEADERS[version])
+
+    result = benchmark("changeforest_bs", "iris", 0, file_path=file_path, profile=True)
+    for column in PROFILING_COLUMNS:
+        assert result[column] >= 0
+
+    benchmark("change_in_mean_bs", "iris", 0, file_path=file_path)
+
+    df = pd.read_csv(file_path)
+    assert list(df.columns) == HEADERS[version].strip().split(",")
+    assert df["estimated_changepoints"].tolist() == ["[0, 50, 100, 150]"] * 2
+
+    if version == 2:
+        assert df[PROFILING_COLUMNS].iloc[0].notna().all()
+        assert df[PROFILING_COLUMNS].iloc[1].isna().all()
+
+
+def test_benchmark_within_limits():
+    expected = benchmark("changeforest_bs", "iris", 0)
+    result = benchmark("changeforest_bs", "iris", 0, timeout=60, max_memory=10**10)
+    assert result["estimated_changepoints"] == expected["estimated_changepoints"]
+    assert "status" not in result
+
+
+@pytest.mark.parametrize(
+    "limits, status", [({"timeout": 0.2}, "timeout"), ({"max_memory": 1}, "oom")]
+)
+def test_benchmark_exceeding_limits(limits, status, tmp_path):
+    file_path = tmp_path / "benchmark.csv"
+    file_path.write_text(HEADERS[3])
+
+    dataset = "dirichlet__n_segments=20__n_observations=4000"
+    result = benchmark("kernseg_rbf", dataset, 0, file_path=file_path, **limits)
+    assert result["status"] == status
+
+    benchmark("change_in_mean_bs", dataset, 0, file_path=file_path, **limits)
+
+    df = pd.read_csv(file_path)
+    assert df["status"].tolist() == [status, "ok"]
+    assert df["score"].isna().tolist() == [True, False]
+
+    # Runs that exceeded limits are not repeated.
+    assert benchmark("kernseg_rbf", dataset, 0, file_path=file_path) is None
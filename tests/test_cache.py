@@ -0,0 +1,83 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from changeforest_simulations import SimulationCache, _cache, _load, benchmark, simulate
+
+
+@pytest.mark.parametrize("scenario", ["iris", "change_in_mean", "dirichlet"])
+def test_simulation_cache(scenario, tmp_path):
+    cache = SimulationCache(tmp_path)
+    expected_changepoints, expected_X = simulate(scenario, seed=1)
+
+    assert cache.get(scenario, 1) is None
+
+    for _ in range(2):  # First call fills the cache, second call reads from it.
+        changepoints, X = simulate(scenario, seed=1, cache=cache)
+        assert type(changepoints) == type(expected_changepoints)
+        assert str(list(changepoints)) == str(list(expected_changepoints))
+        np.testing.assert_array_equal(X, expected_X)
+
+    assert isinstance(X, np.memmap)
+    assert not X.flags.writeable
+    assert cache.get(scenario, 2) is None
+
+
+def test_simulation_cache_dtype(tmp_path):
+    cache = SimulationCache(tmp_path)
+    simulate("iris", seed=0, cache=cache)
+
+    assert cache.get("iris", 0, dtype=np.float32) is None
+    _, X = simulate("iris", seed=0, cache=cache, dtype=np.float32)
+    assert cache.get("iris", 0, dtype=np.float32)[1].dtype == np.float32
+    assert cache.get("iris", 0)[1].dtype == np.float64
+
+
+def test_simulation_cache_key_changes_with_code_and_data(tmp_path, monkeypatch):
+    cache = SimulationCache(tmp_path / "cache")
+    key = cache.key("iris", 0)
+    other_key = cache.key("change_in_mean", 0)
+    assert cache.key("iris", 0) == key
+    assert cache.key("iris", 1) != key
+
+    monkeypatch.setattr(_cache, "_code_hash", lambda: "changed")
+    assert cache.key("iris", 0) != key
+    monkeypatch.undo()
+
+    iris_path = tmp_path / "iris.csv"
+    shutil.copy(_load._SOURCE_PATHS["iris"][0], iris_path)
+    monkeypatch.setitem(_load._SOURCE_PATHS, "iris", [iris_path])
+    assert cache.key("iris", 0) == key
+
+    with open(iris_path, "a") as f:
+        f.write("5.0,3.0,1.5,0.2,setosa\n")
+    assert cache.key("iris", 0) != key
+    # Scenarios not sampling from iris are not affected.
+    assert cache.key("change_in_mean", 0) == other_key
+
+
+def test_simulation_cache_evicts_least_recently_used(tmp_path):
+    cache = SimulationCache(tmp_path)
+    simulate("iris", seed=0, cache=cache)
+    entry_size = sum(path.stat().st_size for path in tmp_path.glob("*.npy"))
+
+    cache.max_bytes = 2 * entry_size
+    simulate("iris", seed=1, cache=cache)
+    simulate("iris", seed=0, cache=cache)  # Marks seed 0 as recently used.
+    simulate("iris", seed=2, cache=cache)
+
+    assert cache.get("iris", 0) is not None
+    assert cache.get("iris", 1) is None
+    assert cache.get("iris", 2) is not None
+
+
+def test_benchmark_with_cache(tmp_path):
+    cache = SimulationCache(tmp_path)
+    expected = benchmark("changeforest_bs", "iris", 0)
+
+    for _ in range(2):
+        result = benchmark("changeforest_bs", "iris", 0, cache=cache)
+        assert result["estimated_changepoints"] == expected["estimated_changepoints"]
+
+    assert cache.get("iris", 0) is not None
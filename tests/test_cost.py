@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from changeforest_simulations import HEADER, CostModel
+
+
+def _result(method, n_observations, time):
+    dataset = f"dirichlet__n_segments=20__n_observations={n_observations}"
+    return {"method": method, "dataset": dataset, "time": time}
+
+
+def test_cost_model():
+    results = [
+        _result("ecp", 1000, 1.0),
+        _result("ecp", 1000, 3.0),
+        _result("ecp", 2000, 8.0),
+        _result("ecp", 4000, np.nan),
+        _result("change_in_mean_bs", 1000, 0.01),
+        {"method": "change_in_mean_bs", "dataset": "iris", "time": 0.03},
+    ]
+    model = CostModel(results, default=5.0)
+
+    # Median of past runs.
+    assert model.predict("ecp", "dirichlet__n_segments=20__n_observations=1000") == 2
+    # Power law fitted to the medians of the same scenario.
+    assert model.predict(
+        "ecp", "dirichlet__n_segments=20__n_observations=4000"
+    ) == pytest.approx(32)
+    # A single known number of observations is scaled linearly.
+    assert model.predict(
+        "change_in_mean_bs", "dirichlet__n_segments=20__n_observations=3000"
+    ) == pytest.approx(0.03)
+    # Median over all datasets of the method.
+    assert model.predict("change_in_mean_bs", "glass") == pytest.approx(0.02)
+    assert model.predict("kernseg_rbf", "iris") == 5.0
+
+
+def test_cost_model_from_files(tmp_path):
+    file_path = tmp_path / "results.csv"
+    file_path.write_text(
+        HEADER
+        + 'iris,0,ecp,1.0,0.0,0.0,0.0,"[0, 150]","[0, 150]",0,0.5\n'
+        + 'iris,1,ecp,1.0,0.0,0.0,0.0,"[0, 150]","[0, 150]",0,1.5\n'
+    )
+    (tmp_path / "empty.csv").write_text("")
+
+    model = CostModel.from_files(tmp_path.glob("*.csv"))
+    assert model.predict("ecp", "iris") == 1.0
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from changeforest_simulations import LabeledData, load_labeled
+
+
+def test_labeled_data():
+    data = pd.DataFrame(
+        {
+            "a": [0, 1, 2, 3, 4],
+            "b": [5.0, 6, 7, 8, 9],
+            "class": ["y", "x", "y", "z", "y"],
+        }
+    )
+    labeled = LabeledData.from_frame(data)
+
+    assert len(labeled) == 5
+    assert labeled.columns == ["a", "b"]
+    assert labeled.X.dtype == np.float64 and labeled.X.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(labeled.rows("y"), [0, 2, 4])
+    np.testing.assert_array_equal(labeled.rows("z"), [3])
+    assert labeled.value_counts.index.tolist() == ["y", "x", "z"]
+
+    with pytest.raises(KeyError):
+        labeled.rows("w")
+
+
+def test_load_labeled():
+    labeled = load_labeled("iris")
+    assert labeled is load_labeled("iris")
+    assert labeled.X.shape == (150, 4)
+    assert not labeled.X.flags["WRITEABLE"]
@@ -1,6 +1,15 @@
+import os
+
+import numpy as np
 import pytest
 
-from changeforest_simulations import load
+from changeforest_simulations import (
+    _load,
+    clear_cache,
+    load,
+    load_labeled,
+    set_cache_limit,
+)
 
 
 @pytest.mark.parametrize(
@@ -27,3 +36,56 @@ def test_load(dataset, expected_shape):
     # Load twice as we might have downloaded directly from openml the first time.
     data = load(dataset)
     assert data.shape == expected_shape
+
+
+def test_load_is_cached():
+    data = load("wine")
+    assert np.shares_memory(data["alcohol"].to_numpy(), load("wine")["alcohol"])
+    assert data.index.is_unique is False  # Index of the concatenated csv files.
+
+    with pytest.raises(ValueError):
+        data["alcohol"].to_numpy()[0] = 0
+
+
+def test_clear_cache_and_limit():
+    iris, glass = load_labeled("iris"), load_labeled("glass")
+    assert load_labeled("iris") is iris
+
+    clear_cache()
+    assert load_labeled("iris") is not iris
+
+    try:
+        set_cache_limit(0)  # Only the most recently loaded dataset is kept.
+        glass = load_labeled("glass")
+        assert load_labeled("glass") is glass
+        iris = load_labeled("iris")
+        assert load_labeled("glass") is not glass
+    finally:
+        set_cache_limit(4 * 2**30)
+
+
+def test_binary_copy(tmp_path, monkeypatch):
+    source = tmp_path / "iris.csv"
+    source.write_bytes(_load._IRIS_PATH.read_bytes())
+    monkeypatch.setattr(_load, "_IRIS_PATH", source)
+    monkeypatch.setitem(_load._SOURCE_PATHS, "iris", [source])
+    monkeypatch.setattr(_load, "_BINARY_PATH", tmp_path / ".binary")
+
+    expected = _load._read("iris", "class")
+    assert (tmp_path / ".binary" / "iris" / "meta.json").exists()
+
+    entry = _load._read_binary("iris")
+    assert entry.columns == expected.columns
+    assert entry.data.columns == expected.data.columns
+    assert not entry.data.X.flags["WRITEABLE"]
+    np.testing.assert_array_equal(entry.data.X, expected.data.X)
+    np.testing.assert_array_equal(entry.data.y, expected.data.y)
+    assert entry.data.y.dtype == expected.data.y.dtype
+
+    # Same content, different modification time: validated by checksum.
+    os.utime(source, ns=(0, 0))
+    assert _load._read_binary("iris") is not None
+
+    # Changed content: the binary copy is not used.
+    source.write_text(source.read_text().replace("5.1", "5.2", 1))
+    assert _load._read_binary("iris") is None
@@ -1,7 +1,13 @@
+import os
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pytest
 
-from changeforest_simulations import estimate_changepoints, simulate
+from changeforest_simulations import benchmark, estimate_changepoints, r_pool, simulate
+from changeforest_simulations.methods import FLOAT32_METHODS, _r_pool
 
 
 @pytest.mark.parametrize(
@@ -76,3 +82,79 @@ def test_minimal_relative_segment_length(method):
         X, method, minimal_relative_segment_length=0.02
     )
     assert len(many_changepoints) >= 20
+
+
+@pytest.mark.parametrize(
+    "method", ["changeforest_bs", "changekNN_bs", "kernseg_rbf", "multirank"]
+)
+def test_method_float32(method):
+    _, X = simulate("iris")
+    expected = estimate_changepoints(X, method, minimal_relative_segment_length=0.01)
+    _, X = simulate("iris", dtype=np.float32)
+    changepoints = estimate_changepoints(
+        X, method, minimal_relative_segment_length=0.01
+    )
+    assert list(changepoints) == list(expected)
+
+
+@pytest.mark.parametrize("method", sorted(FLOAT32_METHODS))
+def test_method_float32_peak_memory(method):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, 200))
+    X[50:] += 1
+
+    peaks = {}
+    for dtype in [np.float64, np.float64, np.float32]:  # The first run warms up.
+        X_ = X.astype(dtype)
+        tracemalloc.start()
+        estimate_changepoints(X_, method, minimal_relative_segment_length=0.1)
+        peaks[dtype] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    # A double precision copy of X would add X.nbytes.
+    assert peaks[np.float32] < peaks[np.float64] + X.nbytes / 2
+
+
+@pytest.mark.parametrize("method", ["ecp", "decon", "mnwbs_changepoints"])
+def test_r_pool(method):
+    _, X = simulate("iris")
+    expected = estimate_changepoints(X, method, minimal_relative_segment_length=0.01)
+
+    with r_pool(n_workers=2), ThreadPoolExecutor(2) as executor:
+        results = executor.map(
+            lambda _: estimate_changepoints(X, method, 0.01), range(4)
+        )
+        for changepoints in results:
+            assert list(changepoints) == list(expected)
+
+
+def test_r_pool_replaces_workers_exceeding_limits():
+    with r_pool(n_workers=1):
+        pid = _r_pool.run(os.getpid)[1]
+        assert pid != os.getpid()
+        assert _r_pool.run(os.getpid) == ("ok", pid)
+
+        assert _r_pool.run(time.sleep, 10, timeout=0.5) == ("timeout", None)
+        status, new_pid = _r_pool.run(os.getpid)
+        assert status == "ok" and new_pid != pid
+
+        status, message = _r_pool.run(divmod, 1, 0)
+        assert status == "error" and "ZeroDivisionError" in message
+        with pytest.raises(RuntimeError, match="ZeroDivisionError"):
+            _r_pool.call(divmod, 1, 0)
+        # Workers are reused after errors.
+        assert _r_pool.run(os.getpid) == ("ok", new_pid)
+
+    assert not _r_pool.is_running()
+
+
+@pytest.mark.parametrize("limits, status", [({}, "ok"), ({"timeout": 0.01}, "timeout")])
+def test_benchmark_ecp_on_r_pool(limits, status):
+    expected = benchmark("ecp", "iris", 0)
+    with r_pool():
+        result = benchmark("ecp", "iris", 0, profile=True, **limits)
+
+    assert result.get("status", "ok") == status
+    if status == "ok":
+        assert result["estimated_changepoints"] == expected["estimated_changepoints"]
+        assert result["peak_rss"] > 0
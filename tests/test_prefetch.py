@@ -0,0 +1,117 @@
+import pytest
+
+from changeforest_simulations import _load, prefetch_datasets
+from changeforest_simulations._prefetch import read_checksums
+
+
+@pytest.fixture
+def target(tmp_path, monkeypatch):
+    paths = {
+        dataset: [tmp_path / path.name for path in _load._SOURCE_PATHS[dataset]]
+        for dataset in ["iris", "wine"]
+    }
+    for dataset, dataset_paths in paths.items():
+        monkeypatch.setitem(_load._SOURCE_PATHS, dataset, dataset_paths)
+    return tmp_path
+
+
+@pytest.mark.parametrize("url", [False, True])
+def test_prefetch_from_mirror(target, url):
+    base_url = _load._DATASET_PATH.as_uri() if url else str(_load._DATASET_PATH)
+
+    fetched = prefetch_datasets(["iris", "wine"], base_url=base_url)
+    assert sorted(path.name for path in fetched) == [
+        "iris.csv",
+        "winequality-red.csv",
+        "winequality-white.csv",
+    ]
+    for path in fetched:
+        assert path.read_bytes() == (_load._DATASET_PATH / path.name).read_bytes()
+
+    # Valid files are not fetched again.
+    assert prefetch_datasets(["iris", "wine"], base_url=base_url) == []
+    assert not list(target.glob("*.tmp"))
+
+
+def test_prefetch_checksum_mismatch(target, tmp_path):
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    (mirror / "iris.csv").write_text("not iris")
+
+    with pytest.raises(ValueError, match="Checksum"):
+        prefetch_datasets(["iris"], base_url=str(mirror))
+
+    assert not (target / "iris.csv").exists()
+    assert not list(target.glob("*.tmp"))
+
+
+def test_prefetch_from_source_fetches_shared_files_once(target, monkeypatch):
+    monkeypatch.setitem(
+        _load._SOURCE_PATHS, "red_wine", [target / "winequality-red.csv"]
+    )
+    monkeypatch.setitem(
+        _load._SOURCE_PATHS, "white_wine", [target / "winequality-white.csv"]
+    )
+
+    monkeypatch.delenv("CHANGEFOREST_SIMULATIONS_MIRROR", raising=False)
+    fetched = []
+    monkeypatch.setattr(_load, "_load_frame", fetched.append)
+
+    prefetch_datasets(["wine", "red_wine", "white_wine"], n_jobs=1)
+    assert sorted(fetched) == ["red_wine", "white_wine"]
+
+
+def test_read_checksums():
+    checksums = read_checksums()
+    assert "iris.csv" in checksums
+    for name, checksum in checksums.items():
+        assert _load._sha256(_load._DATASET_PATH / name) == checksum
+
+
+@pytest.mark.parametrize(
+    "dataset",
+    [
+        pytest.param(
+            dataset,
+            marks=pytest.mark.xfail(
+                strict=True, reason="Checksum of converted csv not recorded yet."
+            ),
+        )
+        if dataset == "covertype"
+        else dataset
+        for dataset in _load.DATASETS
+    ],
+)
+def test_checksums_cover_datasets(dataset):
+    checksums = read_checksums()
+    for path in _load._SOURCE_PATHS[dataset]:
+        assert path.name in checksums
+
+
+def test_prefetch_from_mirror_with_mirror_checksums(tmp_path, monkeypatch):
+    target = tmp_path / "target"
+    target.mkdir()
+    monkeypatch.setitem(_load._SOURCE_PATHS, "covertype", [target / "covertype.csv"])
+
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    (mirror / "covertype.csv").write_text("elevation,class\n2596,5\n")
+
+    with pytest.raises(ValueError, match="No checksum"):
+        prefetch_datasets(["covertype"], base_url=str(mirror))
+
+    checksum = _load._sha256(mirror / "covertype.csv")
+    (mirror / "SHA256SUMS").write_text(f"{checksum}  covertype.csv\n")
+    assert prefetch_datasets(["covertype"], base_url=str(mirror)) == [
+        target / "covertype.csv"
+    ]
+    assert (target / "covertype.csv").read_text() == "elevation,class\n2596,5\n"
+
+    # Checksums in datasets/SHA256SUMS take precedence over those of the mirror.
+    (mirror / "iris.csv").write_text("not iris")
+    (mirror / "SHA256SUMS").write_text(
+        f"{_load._sha256(mirror / 'iris.csv')}  iris.csv\n"
+    )
+    monkeypatch.setitem(_load._SOURCE_PATHS, "iris", [target / "iris.csv"])
+    with pytest.raises(ValueError, match="Checksum"):
+        prefetch_datasets(["iris"], base_url=str(mirror))
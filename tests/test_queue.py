@@ -0,0 +1,46 @@
+import os
+import time
+
+from changeforest_simulations import Task, TaskQueue
+
+
+def test_task_queue(tmp_path):
+    task = Task("ecp", "iris", 0, tmp_path / "results.csv")
+    queue, other_queue = TaskQueue(tmp_path / "queue"), TaskQueue(tmp_path / "queue")
+
+    assert queue.claim(task)
+    assert not other_queue.claim(task)
+    assert other_queue.claim(task._replace(seed=1))
+
+    queue.release(task)
+    assert other_queue.claim(task)
+
+
+def test_task_queue_reclaims_stale(tmp_path):
+    task = Task("ecp", "iris", 0, tmp_path / "results.csv")
+    queue = TaskQueue(tmp_path / "queue", stale_after=60)
+    other_queue = TaskQueue(tmp_path / "queue", stale_after=60)
+
+    assert queue.claim(task)
+    (path,) = (tmp_path / "queue").glob("*.lock")
+
+    # The heartbeat keeps the claim alive.
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    queue.heartbeat()
+    assert not other_queue.claim(task)
+
+    # Without heartbeat, e.g., after a crash, the claim becomes stale.
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    assert other_queue.claim(task)
+    assert [p.name for p in (tmp_path / "queue").iterdir()] == [path.name]
+
+
+def test_task_queue_releases_on_exit(tmp_path):
+    task = Task("ecp", "iris", 0, tmp_path / "results.csv")
+
+    with TaskQueue(tmp_path / "queue") as queue:
+        assert queue.claim(task)
+        with queue.lock(task.file_path):
+            assert len(list((tmp_path / "queue").iterdir())) == 2
+
+    assert list((tmp_path / "queue").iterdir()) == []
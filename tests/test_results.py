@@ -0,0 +1,119 @@
+import os
+
+import pandas as pd
+import pytest
+
+from changeforest_simulations import HEADER, CSVResultStore, get_result_store
+
+
+def _result(dataset="iris", seed=0, method="changeforest_bs"):
+    return {
+        "dataset": dataset,
+        "seed": seed,
+        "method": method,
+        "score": 1.0,
+        "left_hausdorff": 0.0,
+        "right_hausdorff": 0.0,
+        "symmetric_hausdorff": 0.0,
+        "true_changepoints": [0, 50, 100, 150],
+        "estimated_changepoints": [0, 50, 100, 150],
+        "n_cpts": 2,
+        "time": 0.1,
+    }
+
+
+def test_csv_result_store(tmp_path):
+    file_path = tmp_path / "results.csv"
+    file_path.write_text(HEADER)
+
+    store = CSVResultStore(file_path)
+    assert ("iris", 0, "changeforest_bs") not in store
+
+    store.append(_result())
+    assert ("iris", 0, "changeforest_bs") in store
+    assert store.get("iris", 0, "changeforest_bs")["estimated_changepoints"] == (
+        "[0, 50, 100, 150]"
+    )
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        store.append(_result())
+
+    # A second store (e.g., in another process) sees the appended result.
+    other_store = CSVResultStore(file_path)
+    assert other_store.keys() == {("iris", 0, "changeforest_bs")}
+
+    # Results appended by the other store are picked up incrementally.
+    other_store.append_many([_result(seed=1), _result(method="ecp")])
+    assert store.keys() == {
+        ("iris", 0, "changeforest_bs"),
+        ("iris", 1, "changeforest_bs"),
+        ("iris", 0, "ecp"),
+    }
+
+
+def test_csv_result_store_ignores_incomplete_line(tmp_path):
+    file_path = tmp_path / "results.csv"
+    file_path.write_text(HEADER + 'iris,0,ecp,1.0,0.0,0.0,0.0,"[0, 50')
+
+    store = CSVResultStore(file_path)
+    assert store.keys() == set()
+
+    with open(file_path, "a") as f:
+        f.write(', 100, 150]","[0, 150]",0,0.1\n')
+
+    assert store.get("iris", 0, "ecp")["true_changepoints"] == "[0, 50, 100, 150]"
+
+
+def test_csv_result_store_raises_on_wrong_header(tmp_path):
+    file_path = tmp_path / "results.csv"
+    file_path.write_text("dataset,seed,method\n")
+
+    with pytest.raises(ValueError, match="header"):
+        CSVResultStore(file_path)
+
+
+def test_get_result_store(tmp_path):
+    file_path = tmp_path / "results.csv"
+    file_path.write_text(HEADER)
+
+    assert get_result_store(file_path) is get_result_store(str(file_path))
+
+
+def test_csv_result_store_removes_incomplete_line_on_write(tmp_path):
+    file_path = tmp_path / "results.csv"
+    # A writer crashed in the middle of a line.
+    file_path.write_text(HEADER + 'iris,0,ecp,1.0,0.0,0.0,0.0,"[0, 50')
+
+    store = CSVResultStore(file_path)
+    store.append(_result())
+
+    assert CSVResultStore(file_path).keys() == {("iris", 0, "changeforest_bs")}
+
+
+@pytest.mark.parametrize("replace", [False, True])
+def test_csv_result_store_detects_rewritten_file(tmp_path, replace):
+    file_path = tmp_path / "results.csv"
+    file_path.write_text(HEADER)
+
+    store = CSVResultStore(file_path)
+    store.append_many([_result(seed=seed) for seed in range(3)])
+
+    # Rewrite the file in place (or replace it) with a larger first row.
+    df = pd.read_csv(file_path)
+    df.loc[0, "method"] = "changeforest_bs__random_forest_n_estimators=100"
+    if replace:
+        df.to_csv(tmp_path / "new.csv", index=False)
+        os.replace(tmp_path / "new.csv", file_path)
+    else:
+        df.to_csv(file_path, index=False)
+
+    assert store.keys() == {
+        ("iris", 0, "changeforest_bs__random_forest_n_estimators=100"),
+        ("iris", 1, "changeforest_bs"),
+        ("iris", 2, "changeforest_bs"),
+    }
+
+    # Rows appended by others are still read incrementally.
+    CSVResultStore(file_path).append(_result(seed=3))
+    assert ("iris", 3, "changeforest_bs") in store
+    assert len(store.keys()) == 4
@@ -0,0 +1,194 @@
+import time
+
+import pandas as pd
+import pytest
+
+from changeforest_simulations import (
+    HEADER,
+    HEADERS,
+    CostModel,
+    Task,
+    TaskQueue,
+    _runner,
+    benchmark,
+    run_tasks,
+)
+from changeforest_simulations._runner import _longest_first, _split_expensive
+
+
+@pytest.mark.parametrize("n_jobs, shared_memory", [(1, False), (2, False), (2, True)])
+def test_run_tasks(tmp_path, n_jobs, shared_memory):
+    file_paths = {seed: tmp_path / f"benchmark_{seed}.csv" for seed in [0, 1]}
+    for file_path in file_paths.values():
+        file_path.write_text(HEADER)
+
+    tasks = [
+        Task(method, dataset, seed, file_path)
+        for seed, file_path in file_paths.items()
+        for dataset in ["iris", "glass"]
+        for method in ["change_in_mean_bs", "changeforest_bs"]
+    ]
+    run_tasks(tasks, n_jobs=n_jobs, shared_memory=shared_memory)
+
+    for seed, file_path in file_paths.items():
+        df = pd.read_csv(file_path)
+        assert len(df) == 4
+        assert df["seed"].eq(seed).all()
+
+        row = df[lambda x: x["dataset"].eq("glass") & x["method"].eq("changeforest_bs")]
+        expected = benchmark("changeforest_bs", "glass", seed)
+        assert row["estimated_changepoints"].iloc[0] == str(
+            expected["estimated_changepoints"]
+        )
+
+    # Running again does not add duplicate rows.
+    run_tasks(tasks, n_jobs=n_jobs)
+    assert len(pd.read_csv(file_paths[0])) == 4
+
+
+def test_run_tasks_skips_larger_after_exceeding_limits(tmp_path):
+    file_path = tmp_path / "benchmark.csv"
+    file_path.write_text(HEADERS[3])
+
+    tasks = [
+        Task(method, f"dirichlet__n_segments=20__n_observations={n}", seed, file_path)
+        for n in [1000, 4000, 8000]
+        for seed in [0, 1, 2]
+        for method in ["change_in_mean_bs", "kernseg_rbf"]
+    ]
+    run_tasks(tasks, timeout=0.5)
+
+    df = pd.read_csv(file_path)
+    assert df[lambda x: x["method"].eq("change_in_mean_bs")]["status"].eq("ok").all()
+
+    # Other seeds with the same or more observations are not run.
+    df = df[lambda x: x["method"].eq("kernseg_rbf")]
+    assert df["status"].tolist() == ["ok"] * 3 + ["timeout"]
+
+
+def test_run_tasks_skips_other_seeds_after_exceeding_limits(tmp_path):
+    file_path = tmp_path / "benchmark.csv"
+    file_path.write_text(HEADERS[3])
+
+    tasks = [Task("kernseg_rbf", "dry-beans", seed, file_path) for seed in [0, 1, 2]]
+    run_tasks(tasks, timeout=0.01)
+
+    df = pd.read_csv(file_path)
+    assert df["seed"].tolist() == [0]
+    assert df["status"].eq("timeout").all()
+
+    # Other seeds are not run with the same limits, but once they are increased.
+    run_tasks(tasks, timeout=0.01)
+    assert len(pd.read_csv(file_path)) == 1
+
+    run_tasks(tasks, timeout=0.5)
+    df = pd.read_csv(file_path)
+    assert df["seed"].tolist() == [0, 1]
+    assert df["status"].eq("timeout").all()
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_run_tasks_ecp_on_r_pool(tmp_path, n_jobs):
+    file_path = tmp_path / "benchmark.csv"
+    file_path.write_text(HEADERS[3])
+
+    tasks = [Task("ecp", "iris", seed, file_path) for seed in [0, 1]]
+    run_tasks(tasks, n_jobs=n_jobs, timeout=60, r_pool=True)
+
+    df = pd.read_csv(file_path).sort_values("seed")
+    assert df["status"].eq("ok").all()
+    assert df["estimated_changepoints"].iloc[0] == str(
+        benchmark("ecp", "iris", 0)["estimated_changepoints"]
+    )
+
+
+def test_longest_first():
+    model = CostModel(
+        [
+            {"method": "ecp", "dataset": "glass", "time": 10.0},
+            {"method": "ecp", "dataset": "wine", "time": 20.0},
+            {"method": "change_in_mean_bs", "dataset": "iris", "time": 1.0},
+        ],
+        default=0.0,
+    )
+    groups = [
+        (("iris", 0, "a.csv"), ["ecp", "change_in_mean_bs"]),
+        (("glass", 0, "a.csv"), ["ecp"]),
+        (("wine", 0, "a.csv"), ["ecp"]),
+        (("abalone", 0, "a.csv"), ["kernseg_rbf"]),
+    ]
+
+    ordered = _longest_first(groups, model, timeout=None)
+    assert [key[0] for key, _ in ordered] == ["wine", "iris", "glass", "abalone"]
+
+    # Predictions are capped at the timeout. Ties keep the original order.
+    ordered = _longest_first(groups, model, timeout=5.0)
+    assert [key[0] for key, _ in ordered] == ["iris", "glass", "wine", "abalone"]
+
+
+def test_split_expensive():
+    model = CostModel(
+        [
+            {"method": "ecp", "dataset": "iris", "time": 100.0},
+            {"method": "mnwbs_changepoints", "dataset": "iris", "time": 50.0},
+            {"method": "change_in_mean_bs", "dataset": "iris", "time": 0.1},
+            {"method": "changeforest_bs", "dataset": "iris", "time": 0.5},
+        ],
+        default=1.0,
+    )
+    methods = ["change_in_mean_bs", "ecp", "changeforest_bs", "mnwbs_changepoints"]
+    groups = [(("iris", 0, "a.csv"), methods)]
+
+    assert _split_expensive(groups, model, timeout=None) == [
+        (("iris", 0, "a.csv"), ["change_in_mean_bs", "changeforest_bs"]),
+        (("iris", 0, "a.csv"), ["ecp"]),
+        (("iris", 0, "a.csv"), ["mnwbs_changepoints"]),
+    ]
+
+    # Methods without past timings are not split off.
+    groups = [(("iris", 0, "a.csv"), ["change_in_mean_bs", "kernseg_rbf", "zigzag"])]
+    assert _split_expensive(groups, model, timeout=None) == groups
+
+
+def _benchmark_many_slowly(methods, dataset, seed, **kwargs):
+    results = []
+    for method in methods:
+        tic = time.time()
+        time.sleep(1)
+        results.append(
+            {"dataset": dataset, "seed": seed, "method": method, "time": tic}
+        )
+    return results
+
+
+def test_run_tasks_runs_expensive_methods_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(_runner, "benchmark_many", _benchmark_many_slowly)
+    file_path = tmp_path / "benchmark.csv"
+    file_path.write_text(HEADER)
+
+    model = CostModel(
+        [{"method": method, "dataset": "iris", "time": 60.0} for method in ["a", "b"]]
+    )
+    tasks = [Task(method, "iris", 0, file_path) for method in ["a", "b"]]
+    run_tasks(tasks, n_jobs=2, cost_model=model)
+
+    # Both methods started before either of them finished.
+    started = pd.read_csv(file_path)["time"]
+    assert len(started) == 2
+    assert abs(started.iloc[0] - started.iloc[1]) < 1
+
+
+def test_run_tasks_with_queue(tmp_path):
+    file_path = tmp_path / "benchmark.csv"
+    file_path.write_text(HEADER)
+
+    tasks = [
+        Task(method, "iris", 0, file_path) for method in ["ecp", "changeforest_bs"]
+    ]
+
+    # Another node is working on the first task.
+    assert TaskQueue(tmp_path / "queue").claim(tasks[0])
+
+    run_tasks(tasks, queue=TaskQueue(tmp_path / "queue"))
+    assert pd.read_csv(file_path)["method"].tolist() == ["changeforest_bs"]
+    assert len(list((tmp_path / "queue").iterdir())) == 1
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from changeforest_simulations import (
+    get_scenario,
+    list_scenarios,
+    register_scenario,
+    scenario_cost,
+    simulate,
+    simulate_iter,
+)
+from changeforest_simulations._scenarios import _SCENARIOS
+
+
+@pytest.fixture
+def custom_scenario():
+    def _simulate(seed=0, n_observations=10, scale=1.0):
+        X = np.random.default_rng(seed).normal(0, scale, (n_observations, 2))
+        X[n_observations // 2 :] += 10
+        return np.array([0, n_observations // 2, n_observations]), X
+
+    register_scenario(
+        "custom",
+        _simulate,
+        parameters={"n_observations": 10, "scale": 1.0},
+        normalize=True,
+        cost=lambda n_observations, **kwargs: n_observations,
+    )
+    yield _simulate
+    del _SCENARIOS["custom"]
+
+
+def test_register_scenario(custom_scenario):
+    assert "custom" in list_scenarios()
+
+    changepoints, X = simulate("custom__n_observations=20", seed=3)
+    np.testing.assert_array_equal(changepoints, [0, 10, 20])
+    assert X.shape == (20, 2)
+
+    # Not lazy, but simulate_iter still works.
+    _, blocks = simulate_iter("custom__n_observations=20", seed=3, block_size=7)
+    np.testing.assert_array_equal(np.concatenate([b for _, b in blocks]), X)
+
+    assert scenario_cost("custom") == 10
+    assert scenario_cost("custom__n_observations=20") == 20
+
+    with pytest.raises(ValueError, match="already registered"):
+        register_scenario("custom", custom_scenario)
+
+
+def test_get_scenario():
+    spec, parameters = get_scenario("iris-noise__n_observations=1000")
+    assert spec.name == "iris-noise"
+    assert spec.blocks is not None
+    assert parameters["n_observations"] == 1000
+    assert parameters["n_segments"] == 100
+
+    with pytest.raises(ValueError, match="Unknown parameters"):
+        get_scenario("iris__n_observations=1000")
+
+    with pytest.raises(ValueError, match="not supported"):
+        get_scenario("unknown")
+
+
+def test_list_scenarios():
+    scenarios = list_scenarios()
+    for scenario in ["iris", "iris-noise", "iris-no-change", "dirichlet"]:
+        assert scenario in scenarios
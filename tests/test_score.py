@@ -1,5 +1,6 @@
 import numpy as np
 import pytest
+from sklearn.metrics import adjusted_rand_score as sklearn_adjusted_rand_score
 
 from changeforest_simulations import (
     adjusted_rand_score,
@@ -15,6 +16,38 @@ def test_adjusted_rand_score(left, right, expected):
     assert adjusted_rand_score(left, right) == expected
 
 
+def _labels(changepoints):
+    labels = np.zeros(changepoints[-1])
+    for i, (start, stop) in enumerate(zip(changepoints[:-1], changepoints[1:])):
+        labels[start:stop] = i
+    return labels
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_adjusted_rand_score_equals_sklearn(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 200))
+
+    def changepoints():
+        inner = np.sort(rng.integers(0, n + 1, rng.integers(0, 10)))
+        return [0] + inner.tolist() + [n]
+
+    true_changepoints, estimated_changepoints = changepoints(), changepoints()
+    expected = sklearn_adjusted_rand_score(
+        _labels(true_changepoints), _labels(estimated_changepoints)
+    )
+    assert adjusted_rand_score(true_changepoints, estimated_changepoints) == expected
+
+
+def test_adjusted_rand_score_large_n():
+    n = 10**9
+    assert adjusted_rand_score([0, n // 2, n], [0, n // 2, n]) == 1
+    assert 0 < adjusted_rand_score([0, n // 2, n], [0, n // 4, n]) < 1
+
+    with pytest.raises(ValueError):
+        adjusted_rand_score([0, 10], [0, 11])
+
+
 @pytest.mark.parametrize(
     "left, right, expected",
     [
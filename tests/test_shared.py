@@ -0,0 +1,62 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from changeforest_simulations import (
+    _load,
+    attach_datasets,
+    clear_cache,
+    load,
+    load_labeled,
+    share_datasets,
+    simulate,
+)
+
+
+def _simulate_in_worker(scenario):
+    data = load_labeled("iris")
+    return data.X.flags["WRITEABLE"], simulate(scenario, seed=1)[1]
+
+
+def test_share_datasets():
+    expected = simulate("iris", seed=1)[1]
+
+    with share_datasets(["iris", "iris"]) as handles:
+        assert len(handles) == 1
+
+        with ProcessPoolExecutor(
+            2,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=attach_datasets,
+            initargs=(handles,),
+        ) as executor:
+            for writeable, X in executor.map(_simulate_in_worker, ["iris"] * 3):
+                assert not writeable
+                np.testing.assert_array_equal(X, expected)
+
+
+def test_attach_datasets():
+    expected = load("glass").copy()
+
+    try:
+        with share_datasets(["glass"]) as handles:
+            clear_cache()
+            attach_datasets(handles)
+            data = load_labeled("glass")
+            assert not data.X.flags["WRITEABLE"]
+            assert load("glass").equals(expected)
+    finally:
+        clear_cache()
+
+
+def test_share_datasets_drops_copy_in_memory(monkeypatch):
+    monkeypatch.setattr(_load, "_read_binary", lambda dataset: None)
+    monkeypatch.setattr(_load, "_write_binary", lambda dataset, entry: None)
+
+    clear_cache()
+    try:
+        with share_datasets(["iris"]):
+            assert _load._cache.nbytes() == 0
+    finally:
+        clear_cache()
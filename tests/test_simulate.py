@@ -1,9 +1,27 @@
+from time import perf_counter
+
 import numpy as np
 import pytest
+from scipy.stats import median_abs_deviation
 
-from changeforest_simulations import simulate
+from changeforest_simulations import (
+    LabeledData,
+    load_labeled,
+    simulate,
+    simulate_iter,
+    simulate_many,
+)
 from changeforest_simulations._load import load_iris, load_letters
-from changeforest_simulations._simulate import normalize, simulate_from_data
+from changeforest_simulations._simulate import (
+    MADSketch,
+    _cascade_round,
+    _exponential_segment_lengths,
+    _gather_with_noise,
+    _get_indices,
+    normalize,
+    simulate_dirichlet,
+    simulate_from_data,
+)
 
 
 @pytest.mark.parametrize(
@@ -68,6 +86,187 @@ def test_simulate_with_segment_sizes(load, segment_sizes):
     assert time_series.shape[0] == sum(segment_sizes)
 
 
+@pytest.mark.parametrize("segment_sizes", [None, range(1, 13)])
+def test_simulate_from_labeled_data(segment_sizes):
+    data = load_iris()
+    kwargs = {"segment_sizes": segment_sizes, "seed": 1}
+
+    changepoints, time_series = simulate_from_data(data, **kwargs)
+    expected_changepoints, expected = simulate_from_data(
+        LabeledData.from_frame(data), **kwargs
+    )
+
+    np.testing.assert_array_equal(changepoints, expected_changepoints)
+    np.testing.assert_array_equal(time_series, expected)
+
+
+@pytest.mark.parametrize("replace", [True, False])
+def test_get_indices(replace):
+    y = load_labeled("glass").y
+    segment_lengths = [5, 3, 8, 1, 4, 6, 2]
+
+    indices = _get_indices(segment_lengths, y, np.random.default_rng(0), replace)
+    assert len(indices) == sum(segment_lengths)
+
+    # Same draws if passed LabeledData.
+    np.testing.assert_array_equal(
+        indices,
+        _get_indices(
+            segment_lengths, load_labeled("glass"), np.random.default_rng(0), replace
+        ),
+    )
+
+    boundaries = np.cumsum([0] + segment_lengths)
+    labels = [np.unique(y[indices[s:e]]) for s, e in zip(boundaries, boundaries[1:])]
+    assert all(len(label) == 1 for label in labels)
+    assert all(a != b for a, b in zip(labels, labels[1:]))
+
+    if not replace:
+        assert len(np.unique(indices)) == len(indices)
+
+
+def _sequential_cascade_round(x):
+    x_rounded = np.zeros(len(x), dtype=np.int_)
+    remainder = 0
+    for idx in range(len(x)):
+        x_rounded[idx] = np.round(x[idx] + remainder)
+        remainder += x[idx] - x_rounded[idx]
+    return x_rounded
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("ties", [True, False])
+def test_cascade_round(seed, ties):
+    rng = np.random.default_rng(seed)
+    if ties:
+        x = rng.integers(0, 20, 1000) / 2
+        x[0] += x.sum() % 1  # Sum to an integer.
+    else:
+        x = rng.exponential(size=1000)
+        x = x / x.sum() * 12345
+
+    expected = _sequential_cascade_round(x)
+    np.testing.assert_array_equal(_cascade_round(x), expected)
+    assert _cascade_round(x).sum() == np.round(x.sum())
+
+
+def test_cascade_round_many_exact_ties():
+    x = np.full(100000, 0.5)
+
+    tic = perf_counter()
+    expected = _sequential_cascade_round(x)
+    loop_time = perf_counter() - tic
+
+    tic = perf_counter()
+    x_rounded = _cascade_round(x)
+    assert perf_counter() - tic < 3 * loop_time + 0.1
+
+    np.testing.assert_array_equal(x_rounded, expected)
+
+
+def test_exponential_segment_lengths_batch():
+    segment_lengths = _exponential_segment_lengths(1000, 100000, 0.0001, [0, 1, 2])
+    assert segment_lengths.shape == (3, 1000)
+
+    for seed in range(3):
+        np.testing.assert_array_equal(
+            segment_lengths[seed],
+            _exponential_segment_lengths(1000, 100000, 0.0001, seed),
+        )
+        assert segment_lengths[seed].sum() == 100000
+
+
+def test_simulate_dirichlet_chunked(tmp_path):
+    kwargs = {"n_segments": 20, "n_observations": 4000, "seed": 1}
+    changepoints, expected = simulate_dirichlet(**kwargs)
+
+    _, X = simulate_dirichlet(chunk_size=7, **kwargs)
+    np.testing.assert_array_equal(X, expected)
+
+    _, X = simulate_dirichlet(dtype=np.float32, **kwargs)
+    np.testing.assert_array_equal(X, expected.astype(np.float32))
+
+    _, X = simulate_dirichlet(out=tmp_path / "X.npy", chunk_size=100, **kwargs)
+    assert isinstance(X, np.memmap)
+    np.testing.assert_array_equal(np.load(tmp_path / "X.npy"), expected)
+
+    with pytest.raises(ValueError, match="shape"):
+        simulate_dirichlet(out=np.empty((10, 20)), **kwargs)
+
+
+@pytest.mark.parametrize(
+    "scenario",
+    [
+        "dirichlet",
+        "dirichlet__n_segments=20__n_observations=4000",
+        "wine-noise__n_observations=1000",
+        "iris",
+        "change_in_mean",
+    ],
+)
+@pytest.mark.parametrize("block_size", [7, 1000])
+def test_simulate_iter(scenario, block_size):
+    expected_changepoints, expected = simulate(scenario, seed=1)
+
+    changepoints, blocks = simulate_iter(scenario, seed=1, block_size=block_size)
+    blocks = list(blocks)
+
+    np.testing.assert_array_equal(changepoints, expected_changepoints)
+    assert [offset for offset, _ in blocks] == list(range(0, len(expected), block_size))
+    assert all(len(block) <= block_size for _, block in blocks)
+    np.testing.assert_array_equal(np.concatenate([b for _, b in blocks]), expected)
+
+
+@pytest.mark.parametrize("scenario", ["iris", "wine-noise", "glass-no-change"])
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_simulate_many(scenario, n_jobs):
+    seeds = [3, 0, 5, 1]
+    simulations = simulate_many(scenario, seeds, n_jobs=n_jobs)
+
+    assert len(simulations) == len(seeds)
+    assert len(simulations[1:3]) == 2
+
+    for seed, (changepoints, X) in zip(seeds, simulations):
+        expected_changepoints, expected = simulate(scenario, seed=seed)
+        np.testing.assert_array_equal(changepoints, expected_changepoints)
+        np.testing.assert_array_equal(X, expected)
+
+    np.testing.assert_array_equal(simulations[-1][1], simulate(scenario, seed=1)[1])
+    np.testing.assert_array_equal(simulations[1:][0][1], simulate(scenario, seed=0)[1])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 10000])
+def test_gather_with_noise(chunk_size):
+    X = np.random.default_rng(0).normal(0, 1, (100, 3))
+    indices = np.random.default_rng(1).integers(0, 100, 1000)
+
+    expected = X[indices] + np.random.default_rng(2).normal(0, 0.5, (1000, 3))
+
+    out = np.empty((1000, 3))
+    rng = np.random.default_rng(2)
+    _gather_with_noise(X, indices, 0.5, rng, out, chunk_size=chunk_size)
+    np.testing.assert_array_equal(out, expected)
+
+
+@pytest.mark.parametrize(
+    "scenario",
+    [
+        "iris",
+        "glass-no-change",
+        "wine-noise__n_observations=1000",
+        "dirichlet__n_segments=20__n_observations=10000",
+        "change_in_mean",
+    ],
+)
+def test_simulate_float32(scenario):
+    expected_changepoints, expected = simulate(scenario, seed=2)
+    changepoints, X = simulate(scenario, seed=2, dtype=np.float32)
+
+    assert X.dtype == np.float32
+    np.testing.assert_array_equal(changepoints, expected_changepoints)
+    np.testing.assert_array_equal(X, expected.astype(np.float32))
+
+
 def test_normalize():
     rng = np.random.default_rng(0)
     X = rng.normal(0, 1, (1000, 3))
@@ -79,6 +278,41 @@ def test_normalize():
     np.testing.assert_almost_equal(np.std(X_normalized, axis=0), [1, 1, 1], decimal=1)
 
 
+@pytest.mark.parametrize("block_size", [1, 2, 5])
+def test_normalize_in_place(block_size):
+    rng = np.random.default_rng(0)
+    X = rng.normal(0, 1, (1000, 4)) * [1, 2, 0.1, 0]
+    mad = median_abs_deviation(X[1:] - X[:-1], axis=0)
+    mad[mad == 0] = 1
+
+    np.testing.assert_array_equal(normalize(X, block_size=block_size), X / mad)
+
+    expected = X / mad
+    assert normalize(X, copy=False, block_size=block_size) is X
+    np.testing.assert_array_equal(X, expected)
+
+
+def test_mad_sketch():
+    rng = np.random.default_rng(0)
+    X = rng.normal(0, 1, (10000, 3)) * [1, 2, 0.1]
+    mad = median_abs_deviation(X[1:] - X[:-1], axis=0)
+
+    # With a sample at least as large as the time series, the MAD is exact.
+    sketch = MADSketch(3, sample_size=len(X))
+    for offset in range(0, len(X), 333):
+        sketch.update(X[offset : offset + 333])
+    np.testing.assert_allclose(sketch.mad(), mad)
+
+    sketch = MADSketch(3, sample_size=2000)
+    for offset in range(0, len(X), 333):
+        sketch.update(X[offset : offset + 333])
+    np.testing.assert_allclose(sketch.mad(), mad, rtol=0.1)
+
+    np.testing.assert_allclose(
+        normalize(X, sample_size=2000), X / sketch.mad(), rtol=0.1
+    )
+
+
 def test_simulate_change_in_covariance():
     d, rho = 5, 0.7
     Sigma = np.full((d, d), rho)
@@ -21,3 +21,9 @@ from changeforest_simulations.utils import string_to_kwargs
 )
 def test_string_to_kwargs(string, kwargs):
     assert string_to_kwargs(string) == kwargs
+
+
+def test_string_to_kwargs_returns_copies():
+    _, kwargs = string_to_kwargs("method__n_observations=10")
+    kwargs["n_observations"] = 20
+    assert string_to_kwargs("method__n_observations=10")[1] == {"n_observations": 10}
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from changeforest_simulations import HEADERS, Task, run_tasks, verify_results
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_verify_results(tmp_path, n_jobs):
+    file_path = tmp_path / "benchmark.csv"
+    file_path.write_text(HEADERS[3])
+
+    tasks = [
+        Task(method, dataset, 0, file_path)
+        for dataset in ["iris", "glass"]
+        for method in ["change_in_mean_bs", "changeforest_bs"]
+    ]
+    run_tasks(tasks)
+
+    # Tamper with one estimate and make another run look much faster.
+    df = pd.read_csv(file_path)
+    df.loc[0, "estimated_changepoints"] = "[0, 49, 100, 150]"
+    df.loc[1, "time"] = 1e-9
+    df.to_csv(file_path, index=False)
+
+    report = verify_results(
+        [file_path], fraction=1, n_jobs=n_jobs, time_ratio=1e3, min_time=0
+    )
+    report = report.set_index(["dataset", "method"])
+
+    assert len(report) == 4
+    assert report["matches"].sum() == 3
+    assert not report.loc[("iris", "change_in_mean_bs"), "matches"]
+    assert report.loc[("iris", "changeforest_bs"), "slower"]
+    assert report["slower"].sum() == 1
+
+
+def test_verify_results_n_per_method(tmp_path):
+    file_path = tmp_path / "benchmark.csv"
+    file_path.write_text(HEADERS[3])
+    run_tasks([Task("change_in_mean_bs", d, 0, file_path) for d in ["iris", "glass"]])
+
+    report = verify_results([file_path], n_per_method=1)
+    assert len(report) == 1
+    assert report["matches"].all()
+
+    with pytest.raises(ValueError, match="Exactly one"):
+        verify_results([file_path], fraction=0.5, n_per_method=1)